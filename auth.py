@@ -6,29 +6,43 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from pwdlib import PasswordHash
-from sqlmodel import Session
+from pydantic import EmailStr, TypeAdapter
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config import settings
-from database import get_session
+from database import get_async_session
+from hashing import PoolSaturated, hashing_pool
 from models import User
+from principal_cache import principal_cache, token_fingerprint
 
 # ───────────────────────────────────────────────
 # Password Hashing
 # ───────────────────────────────────────────────
-password_hash = PasswordHash.recommended()
-
 # ⚠ tokenUrl MUST be a string (cannot be None) otherwise Render crashes
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/auth/login",    # only for docs schema — JWT login still works
     auto_error=False               # allows us to manually raise 401
 )
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry shortly",
+        headers={"Retry-After": str(settings.HASH_POOL_RETRY_AFTER_SECONDS)},
+    )
+
+# argon2 runs on the dedicated hashing pool, never on the request thread/loop
 def hash_password(password: str) -> str:
-    return password_hash.hash(password)
+    try:
+        return hashing_pool.hash(password)
+    except PoolSaturated:
+        raise _hashing_busy()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_hash.verify(plain_password, hashed_password)
+    try:
+        return hashing_pool.verify(plain_password, hashed_password)
+    except PoolSaturated:
+        raise _hashing_busy()
 
 # ───────────────────────────────────────────────
 # JWT Token Creation
@@ -40,12 +54,25 @@ def create_access_token(user_id: int, expires_delta: Optional[timedelta] = None)
     to_encode = {"sub": str(user_id), "exp": expire}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+def decode_user_id(token: str) -> Optional[int]:
+    """User id from a valid token, or None (for WebSocket handshakes)."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+def warm() -> None:
+    """First-use cost of the JWT backend and email validation, paid at startup (see main._load)"""
+    decode_user_id(create_access_token(0))
+    TypeAdapter(EmailStr).validate_python("warmup@example.com")
+
 # ───────────────────────────────────────────────
 # Get Current User — PRIMARY AUTH FUNCTION
 # ───────────────────────────────────────────────
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ) -> User:
     if not token:
         raise HTTPException(
@@ -66,18 +93,32 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.get(User, int(user_id))
+    fingerprint = token_fingerprint(token)
+    user = principal_cache.get(int(user_id), fingerprint)
+    if user is not None:
+        return user
+
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Detached, like a cache hit — sync routes db.add() it into their own session
+    db.expunge(user)
+    principal_cache.put(fingerprint, user)
     return user
 
+
+def invalidate_principal(user_id: Optional[int]) -> None:
+    """Drop cached principals for a user — call after any write to that user."""
+    if user_id is not None:
+        principal_cache.invalidate(user_id)
+
 # ───────────────────────────────────────────────
 # Optional current user (for public routes)
 # ───────────────────────────────────────────────
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ) -> Optional[User]:
     if not token:
         return None
@@ -91,7 +132,7 @@ async def get_current_user_optional(
 # ───────────────────────────────────────────────
 async def get_current_user_allow_pending(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ) -> User:
     user = await get_current_user(token, db)
     return user  # pending users allowed by design
@@ -0,0 +1,195 @@
+# backend/backplane.py
+"""
+Pub/sub backplane under ConnectionManager so rooms work across workers.
+
+A manager publishes every broadcast to its room's channel; every other
+process subscribed to the same namespace delivers the frame to its own local
+sockets. Room membership is kept in the backplane too, so admission checks and
+room sizes see every worker's connections.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Set
+
+from config import settings
+
+logger = logging.getLogger("backplane")
+
+# (room_id, origin instance id, raw frame) → None
+RemoteHandler = Callable[[str, str, str], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """Interface. One instance per ConnectionManager (i.e. per namespace)."""
+
+    @property
+    def distributed(self) -> bool:
+        """False when nobody else could receive a publish (skip encoding it)."""
+        return True
+
+    @abstractmethod
+    async def start(self, origin: str, handler: RemoteHandler) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, room_id: str, origin: str, data: str) -> None:
+        ...
+
+    @abstractmethod
+    async def join(self, room_id: str, member_id: str) -> int:
+        """Register a member and return the room's size across all workers."""
+
+    @abstractmethod
+    async def leave(self, room_id: str, member_id: str) -> int:
+        ...
+
+    @abstractmethod
+    async def members(self, room_id: str) -> int:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryBackplane(Backplane):
+    """
+    Single-process backplane. Managers that share one instance behave like
+    separate workers, which is how the cross-worker path is exercised locally.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, RemoteHandler] = {}
+        self._members: Dict[str, Set[str]] = {}
+
+    @property
+    def distributed(self) -> bool:
+        return len(self._handlers) > 1
+
+    async def start(self, origin: str, handler: RemoteHandler) -> None:
+        self._handlers[origin] = handler
+
+    async def publish(self, room_id: str, origin: str, data: str) -> None:
+        for other, handler in list(self._handlers.items()):
+            if other != origin:
+                await handler(room_id, origin, data)
+
+    async def join(self, room_id: str, member_id: str) -> int:
+        members = self._members.setdefault(room_id, set())
+        members.add(member_id)
+        return len(members)
+
+    async def leave(self, room_id: str, member_id: str) -> int:
+        members = self._members.get(room_id)
+        if members is None:
+            return 0
+        members.discard(member_id)
+        if not members:
+            del self._members[room_id]
+            return 0
+        return len(members)
+
+    async def members(self, room_id: str) -> int:
+        return len(self._members.get(room_id, ()))
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub + sorted-set membership.
+
+    Members are scored by last heartbeat so sockets owned by a crashed worker
+    age out after `member_ttl` seconds instead of haunting the room forever.
+    Pass `client=` to run against a local stand-in (e.g. fakeredis).
+    """
+
+    def __init__(self, namespace: str, url: str = "", member_ttl: float = 60.0, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                raise RuntimeError("WS_BACKPLANE=redis requires the 'redis' package (see requirements.txt)")
+            client = aioredis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.namespace = namespace
+        self.member_ttl = member_ttl
+        self._local: Dict[str, Set[str]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def _channel(self, room_id: str) -> str:
+        return f"skx:{self.namespace}:room:{room_id}"
+
+    def _members_key(self, room_id: str) -> str:
+        return f"skx:{self.namespace}:members:{room_id}"
+
+    async def start(self, origin: str, handler: RemoteHandler) -> None:
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe(self._channel("*"))
+        prefix_len = len(self._channel(""))
+
+        async def listen():
+            async for msg in pubsub.listen():
+                if msg.get("type") != "pmessage":
+                    continue
+                sender, _, data = msg["data"].partition("|")
+                if sender == origin:
+                    continue
+                try:
+                    await handler(msg["channel"][prefix_len:], sender, data)
+                except Exception as e:
+                    logger.error(f"Backplane delivery failed: {e}")
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.member_ttl / 3)
+                now = time.time()
+                for room_id, members in list(self._local.items()):
+                    if members:
+                        await self.redis.zadd(self._members_key(room_id), {m: now for m in members})
+
+        self._tasks = [asyncio.create_task(listen()), asyncio.create_task(heartbeat())]
+
+    async def publish(self, room_id: str, origin: str, data: str) -> None:
+        await self.redis.publish(self._channel(room_id), f"{origin}|{data}")
+
+    async def join(self, room_id: str, member_id: str) -> int:
+        self._local.setdefault(room_id, set()).add(member_id)
+        await self.redis.zadd(self._members_key(room_id), {member_id: time.time()})
+        return await self.members(room_id)
+
+    async def leave(self, room_id: str, member_id: str) -> int:
+        local = self._local.get(room_id)
+        if local is not None:
+            local.discard(member_id)
+            if not local:
+                del self._local[room_id]
+        await self.redis.zrem(self._members_key(room_id), member_id)
+        return await self.members(room_id)
+
+    async def members(self, room_id: str) -> int:
+        key = self._members_key(room_id)
+        await self.redis.zremrangebyscore(key, "-inf", time.time() - self.member_ttl)
+        return await self.redis.zcard(key)
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for room_id, members in list(self._local.items()):
+            if members:
+                await self.redis.zrem(self._members_key(room_id), *members)
+        self._local.clear()
+
+
+def create_backplane(namespace: str) -> Backplane:
+    """Backplane selected by settings.WS_BACKPLANE (memory | redis)."""
+    if settings.WS_BACKPLANE == "redis":
+        return RedisBackplane(
+            namespace,
+            url=settings.REDIS_URL,
+            member_ttl=settings.WS_MEMBER_TTL_SECONDS,
+        )
+    return InMemoryBackplane()
@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_async_db.py
+"""
+Requests/sec for one worker under concurrent load: DB access from async
+handlers through the sync engine (the old path) vs. the async engine.
+
+    python benchmarks/bench_async_db.py [--latency-ms 2] [--concurrency 25] [--seconds 5]
+
+Each request does what an authenticated chat-history read does: load the
+user, then read one page of messages. --latency-ms is added to every SQL
+statement on the thread that executes it (the request thread for the sync
+engine, aiosqlite's worker for the async one), standing in for the network
+round trip to Postgres. Runs against a throwaway SQLite file; nothing
+touches DATABASE_URL.
+
+blocking — async def + sync Session: every query stalls the event loop.
+           Skipped when --concurrency exceeds the sync pool: sessions only
+           give their connection back from a threadpool cleanup step, so a
+           loop blocked on checkout never lets them, and the worker hangs
+           until pool_timeout
+thread    — def + sync Session: FastAPI's threadpool (40 threads by default)
+async     — async def + AsyncSession (get_async_session)
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="skx-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from database import async_engine, engine, get_async_session, get_session, init_db  # noqa: E402
+from models import Message, User  # noqa: E402
+
+LATENCY = 0.0
+
+
+def _add_latency(dbapi_connection, _record):
+    # sqlite3 calls the trace callback on whichever thread runs the statement
+    driver = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+    raw = getattr(driver, "_conn", driver)  # aiosqlite.Connection wraps sqlite3's
+    raw.set_trace_callback(lambda _sql: time.sleep(LATENCY))
+
+
+event.listen(engine, "connect", _add_latency)
+event.listen(async_engine.sync_engine, "connect", _add_latency)
+
+
+def _page_stmt():
+    key = Message.conversation_key_for(1, 2)
+    return (
+        select(Message)
+        .where(Message.conversation_key == key)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(50)
+    )
+
+
+app = FastAPI()
+
+
+@app.get("/blocking")
+async def blocking(db: Session = Depends(get_session)):
+    db.get(User, 1)
+    return len(db.exec(_page_stmt()).all())
+
+
+@app.get("/thread")
+def thread(db: Session = Depends(get_session)):
+    db.get(User, 1)
+    return len(db.exec(_page_stmt()).all())
+
+
+@app.get("/async")
+async def async_(db: AsyncSession = Depends(get_async_session)):
+    await db.get(User, 1)
+    return len((await db.exec(_page_stmt())).all())
+
+
+def seed(messages: int = 500):
+    init_db()
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"email": f"u{i}@bench.local", "name": f"u{i}", "password_hash": "x"} for i in (1, 2)
+        ])
+        db.execute(insert(Message), [
+            {"sender_id": 1 + i % 2, "receiver_id": 2 - i % 2, "text": f"m{i}",
+             "conversation_key": Message.conversation_key_for(1, 2)}
+            for i in range(messages)
+        ])
+        db.commit()
+
+
+async def load(path: str, concurrency: int, seconds: float) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm the pools
+        done = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                r = await client.get(path)
+                r.raise_for_status()
+                done += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done / (time.perf_counter() - started)
+
+
+async def main():
+    global LATENCY
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    seed()
+    LATENCY = args.latency_ms / 1000
+    print(f"{args.concurrency} concurrent clients, +{args.latency_ms} ms per statement")
+    print(f"{'path':>9} {'req/s':>9}")
+    pool_capacity = engine.pool.size() + engine.pool._max_overflow
+    for name in ("blocking", "thread", "async"):
+        if name == "blocking" and args.concurrency > pool_capacity:
+            print(f"{name:>9} {'(hangs)':>9}  concurrency > {pool_capacity} pooled connections")
+            continue
+        rps = await load(f"/{name}", args.concurrency, args.seconds)
+        print(f"{name:>9} {rps:>9.0f}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
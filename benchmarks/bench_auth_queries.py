@@ -0,0 +1,113 @@
+# backend/benchmarks/bench_auth_queries.py
+"""
+Statement count + latency for login/signup, legacy queries vs current routes.
+
+    python benchmarks/bench_auth_queries.py [--users 5000] [--rounds 500]
+
+Runs against a throwaway SQLite file; nothing touches DATABASE_URL.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="skx-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+os.environ.setdefault("HASH_POOL_KIND", "thread")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException, Response  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from database import engine, init_db  # noqa: E402
+from models import User  # noqa: E402
+from routes import auth as auth_routes  # noqa: E402
+from schemas import UserCreate, UserLogin  # noqa: E402
+
+_statements = []
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(_conn, _cursor, statement, *_):
+    # sqlite_profile emits BEGIN itself; only queries and DML are counted
+    if not statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+        _statements.append(statement)
+
+
+# Hashing is not what we measure here — keep it cheap and constant
+auth_routes.hash_password = lambda p: "x" + p
+auth_routes.verify_password = lambda p, h: h == "x" + p
+
+
+def legacy_login(identifier: str, db: Session):
+    return (
+        db.exec(select(User).where(User.email == identifier)).first()
+        or db.exec(select(User).where(User.username == identifier)).first()
+    )
+
+
+def legacy_signup(payload: UserCreate, db: Session):
+    if db.exec(select(User).where(User.email == payload.email)).first():
+        return None
+    if payload.username and db.exec(select(User).where(User.username == payload.username)).first():
+        return None
+    user = User(email=payload.email, username=payload.username, name="bench", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def measure(label: str, fn, rounds: int):
+    _statements.clear()
+    started = time.perf_counter()
+    for i in range(rounds):
+        with Session(engine) as db:
+            try:
+                fn(i, db)
+            except HTTPException:
+                pass
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(_statements) / rounds:>5.2f} stmts/op  {elapsed / rounds * 1e6:>9.1f} µs/op")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as db:
+        db.add_all(
+            User(email=f"user{i}@bench.dev", username=f"user{i}", name="bench", password_hash="xpw")
+            for i in range(args.users)
+        )
+        db.commit()
+
+    n = args.users
+    # Username logins are the worst case for the legacy path (email miss first)
+    measure("login (legacy)", lambda i, db: legacy_login(f"user{i % n}", db), args.rounds)
+    measure(
+        "login (current)",
+        lambda i, db: auth_routes.login(UserLogin(identifier=f"user{i % n}", password="pw"), db),
+        args.rounds,
+    )
+    measure(
+        "signup (legacy)",
+        lambda i, db: legacy_signup(UserCreate(email=f"old{i}@bench.dev", username=f"old{i}", password="pw"), db),
+        args.rounds,
+    )
+    measure(
+        "signup (current)",
+        lambda i, db: auth_routes.signup(
+            UserCreate(email=f"new{i}@bench.dev", username=f"new{i}", password="pw"), Response(), db, db
+        ),
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
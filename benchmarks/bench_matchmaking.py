@@ -0,0 +1,108 @@
+# backend/benchmarks/bench_matchmaking.py
+"""
+Recommended-teacher ranking across every user: per-pair Python scoring vs.
+the NumPy bitset matrices in matchmaking.py.
+
+    python benchmarks/bench_matchmaking.py [--users 100000] [--skills 500] [--rounds 50]
+
+The matrix is filled in memory; the throwaway SQLite URL only keeps imports
+away from DATABASE_URL.
+
+python — loop over all users, set intersections per candidate
+numpy  — Matchmaker._rank (cache miss)
+cached — Matchmaker.recommend on an unchanged profile set
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='skx-bench-')}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings  # noqa: E402
+from matchmaking import Matchmaker, _Matrix  # noqa: E402
+
+
+def build(users: int, skills: int):
+    rnd = random.Random(42)
+    names = [f"skill{i}" for i in range(skills)]
+    weights = [1 / (i + 1) for i in range(skills)]
+    now = time.time()
+    profiles = {}
+    m = _Matrix(capacity=users)
+    for user_id in range(1, users + 1):
+        teach = set(rnd.choices(names, weights, k=rnd.randint(1, 5)))
+        learn = set(rnd.choices(names, weights, k=rnd.randint(1, 5)))
+        rating = rnd.uniform(1, 5)
+        active = now - rnd.uniform(0, 180 * 86400)
+        profiles[user_id] = (teach, learn, rating, active)
+        m.put(user_id, "both", teach, learn, rating, active)
+    return m, profiles
+
+
+def python_rank(profiles: dict, user_id: int, k: int) -> list:
+    teach, learn, _, _ = profiles[user_id]
+    now = time.time()
+    half_life = settings.MATCH_RECENCY_HALF_LIFE_DAYS * 86400.0
+    scored = []
+    for other, (t, l, rating, active) in profiles.items():
+        if other == user_id:
+            continue
+        overlap = len(t & learn)
+        if not overlap:
+            continue
+        score = (
+            settings.MATCH_WEIGHT_OVERLAP * overlap / len(learn)
+            + settings.MATCH_WEIGHT_MUTUAL * len(l & teach) / len(teach)
+            + settings.MATCH_WEIGHT_RATING * (rating - 1) / 4
+            + settings.MATCH_WEIGHT_RECENCY * 2 ** (-(now - active) / half_life)
+        )
+        scored.append((score, other))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def measure(fn, user_ids: list) -> float:
+    """Median milliseconds per call."""
+    samples = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        fn(user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    m, profiles = build(args.users, args.skills)
+    print(f"built {args.users:,} users × {len(m.vocab)} skills in {time.perf_counter() - started:.1f}s")
+
+    mm = Matchmaker(refresh_seconds=3600, cache_size=args.rounds, results=settings.MATCH_RESULTS)
+    mm._swap(m)
+    user_ids = random.Random(7).sample(range(1, args.users + 1), args.rounds)
+    k = settings.MATCH_RESULTS
+    results = {
+        "python": measure(lambda u: python_rank(profiles, u, k), user_ids[:5]),
+        "numpy": measure(lambda u: mm._rank(m, u), user_ids),
+    }
+    for u in user_ids:
+        mm.recommend(u, k)
+    results["cached"] = measure(lambda u: mm.recommend(u, k), user_ids)
+
+    print(f"{'rank':>8} {'median ms':>10}")
+    for name, ms in results.items():
+        print(f"{name:>8} {ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# backend/benchmarks/bench_pending_count.py
+"""
+Pending-request count + list latency on a large session table, before and
+after the (teacher_id, status, start_time) index.
+
+    python benchmarks/bench_pending_count.py [--sessions 1000000] [--teachers 2000] [--rounds 200]
+
+Runs against a throwaway SQLite file; nothing touches DATABASE_URL.
+
+legacy — SELECT every matching row and count them in Python (pre-index route)
+count  — SELECT COUNT(*) (what the notification counter reconciles with)
+list   — the /pending page: matching rows ordered by start_time
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="skx-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from database import engine, init_db  # noqa: E402
+from models import PENDING_STATUSES, Session as SessionModel, User  # noqa: E402
+
+STATUSES = ["completed"] * 16 + ["active", "declined", "pending_request", "pending_request"]
+INDEX = next(
+    ix for ix in SessionModel.__table__.indexes if ix.name == "ix_session_teacher_status_start"
+)
+
+
+def seed(sessions: int, teachers: int, chunk: int = 50_000):
+    init_db()
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"email": f"u{i}@bench.local", "name": f"u{i}", "password_hash": "x"}
+            for i in range(teachers + 1)
+        ])
+        db.commit()
+        rnd = random.Random(42)
+        base = datetime(2025, 1, 1)
+        for start in range(0, sessions, chunk):
+            db.execute(insert(SessionModel), [
+                {
+                    "teacher_id": rnd.randint(1, teachers),
+                    "learner_id": teachers + 1,
+                    "status": rnd.choice(STATUSES),
+                    "start_time": base + timedelta(seconds=rnd.randint(0, 30_000_000)),
+                }
+                for _ in range(min(chunk, sessions - start))
+            ])
+            db.commit()
+
+
+def legacy(db: Session, teacher_id: int) -> int:
+    return len(db.exec(select(SessionModel).where(
+        SessionModel.teacher_id == teacher_id,
+        SessionModel.status.in_(PENDING_STATUSES),
+    )).all())
+
+
+def count(db: Session, teacher_id: int) -> int:
+    return db.exec(select(func.count()).select_from(SessionModel).where(
+        SessionModel.teacher_id == teacher_id,
+        SessionModel.status.in_(PENDING_STATUSES),
+    )).one()
+
+
+def pending_list(db: Session, teacher_id: int) -> int:
+    return len(db.exec(select(SessionModel).where(
+        SessionModel.teacher_id == teacher_id,
+        SessionModel.status.in_(PENDING_STATUSES),
+    ).order_by(SessionModel.start_time)).all())
+
+
+def measure(fn, teachers: int, rounds: int) -> float:
+    """Median milliseconds per call."""
+    rnd = random.Random(7)
+    samples = []
+    with Session(engine) as db:
+        for _ in range(rounds):
+            teacher_id = rnd.randint(1, teachers)
+            started = time.perf_counter()
+            fn(db, teacher_id)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--teachers", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.sessions, args.teachers)
+    print(f"seeded {args.sessions:,} sessions in {time.perf_counter() - started:.1f}s")
+
+    queries = [("legacy", legacy), ("count", count), ("list", pending_list)]
+    INDEX.drop(engine)
+    before = {name: measure(fn, args.teachers, args.rounds) for name, fn in queries}
+    INDEX.create(engine)
+    after = {name: measure(fn, args.teachers, args.rounds) for name, fn in queries}
+
+    print(f"{'query':>8} {'no index':>12} {'indexed':>12}   (median ms)")
+    for name, _ in queries:
+        print(f"{name:>8} {before[name]:>12.2f} {after[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# backend/benchmarks/bench_signaling_relay.py
+"""
+Signaling throughput in frames/sec per room.
+
+    python benchmarks/bench_signaling_relay.py [--frames 20000] [--peers 2 4 8]
+
+legacy  — receive_json + per-recipient send_json, one await at a time (pre-relay path)
+json    — SIGNALING_FRAME_MODE=json: parse, then ConnectionManager.broadcast
+relay   — SIGNALING_FRAME_MODE=relay: raw frame forwarded untouched
+msgpack — relay with half the room on the msgpack codec (one transcode per frame)
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websocket_manager import JSON, MSGPACK, ConnectionManager, Frame, msgpack  # noqa: E402
+
+SDP_OFFER = json.dumps({
+    "type": "offer",
+    "sdp": "v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\n" + "a=candidate:x\r\n" * 40,
+})
+
+
+class NullSocket:
+    """Counts frames; sends complete immediately like a fast local peer."""
+
+    def __init__(self):
+        self.received = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data):
+        self.received += 1
+
+    async def send_bytes(self, data):
+        self.received += 1
+
+    async def send_json(self, message):
+        json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        self.received += 1
+
+    async def close(self):
+        pass
+
+
+async def run_legacy(peers: int, frames: int) -> float:
+    others = [NullSocket() for _ in range(peers - 1)]   # everyone but the sender
+    started = time.perf_counter()
+    for _ in range(frames):
+        message = json.loads(SDP_OFFER)
+        for ws in others:
+            await ws.send_json(message)
+    return time.perf_counter() - started
+
+
+async def run_manager(peers: int, frames: int, mode: str) -> float:
+    manager = ConnectionManager(queue_max=frames + 1)
+    await manager.start()
+    sockets = [NullSocket() for _ in range(peers)]
+    for i, ws in enumerate(sockets):
+        codec = MSGPACK if mode == "msgpack" and i % 2 else JSON
+        await manager.connect("bench", ws, codec=codec)
+    sender = sockets[0]
+    expected = frames * (peers - 1)
+
+    started = time.perf_counter()
+    for _ in range(frames):
+        if mode == "json":
+            await manager.broadcast("bench", json.loads(SDP_OFFER), sender=sender)
+        else:
+            await manager.relay("bench", Frame.raw(SDP_OFFER, JSON), sender=sender)
+    while sum(ws.received for ws in sockets) < expected:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    for ws in sockets:
+        manager.disconnect("bench", ws)
+    await manager.stop()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--peers", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    modes = ["legacy", "json", "relay"] + (["msgpack"] if msgpack is not None else [])
+    print(f"{'peers':>5} " + " ".join(f"{m:>12}" for m in modes) + "   (frames/sec in, per room)")
+    for peers in args.peers:
+        rates = []
+        for mode in modes:
+            if mode == "legacy":
+                elapsed = await run_legacy(peers, args.frames)
+            else:
+                elapsed = await run_manager(peers, args.frames, mode)
+            rates.append(args.frames / elapsed)
+        print(f"{peers:>5} " + " ".join(f"{r:>12,.0f}" for r in rates))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
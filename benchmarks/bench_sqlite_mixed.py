@@ -0,0 +1,145 @@
+# backend/benchmarks/bench_sqlite_mixed.py
+"""
+Mixed read/write throughput on SQLite: stock settings vs. the
+sqlite_profile pragmas vs. pragmas + writer lane.
+
+    python benchmarks/bench_sqlite_mixed.py [--threads 16] [--write-ratio 0.2] [--seconds 5]
+
+Every thread loops over short sessions: with probability --write-ratio it
+inserts a chat message and commits (the message_batcher path), otherwise it
+reads one page of a conversation (the chat-history path). Each profile gets
+its own throwaway SQLite file; nothing touches DATABASE_URL.
+
+default — SQLAlchemy defaults: rollback journal, sqlite3's 5 s lock timeout
+wal     — sqlite_profile.configure without a lane (pragmas, BEGIN IMMEDIATE writes)
+lane    — wal + the writer lane (SQLITE_WRITER_LANE, the app default)
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.mkdtemp(prefix="skx-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/app.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import exc, insert  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+import sqlite_profile  # noqa: E402
+from config import settings  # noqa: E402
+from models import Message, User  # noqa: E402
+from sqlite_profile import WriterLane  # noqa: E402
+
+USERS = 50
+
+
+def make_engine(profile: str):
+    engine = create_engine(
+        f"sqlite:///{_tmp}/{profile}.db",
+        connect_args={"check_same_thread": False},
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    if profile == "wal":
+        sqlite_profile.configure(engine)
+    elif profile == "lane":
+        sqlite_profile.configure(engine, WriterLane(settings.SQLITE_BUSY_TIMEOUT_MS / 1000))
+    return engine
+
+
+def seed(engine, messages: int = 20_000) -> None:
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(0)
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"email": f"u{i}@bench.local", "name": f"u{i}", "password_hash": "x"}
+            for i in range(1, USERS + 1)
+        ])
+        rows = []
+        for i in range(messages):
+            a, b = rng.sample(range(1, USERS + 1), 2)
+            rows.append({"sender_id": a, "receiver_id": b, "text": f"m{i}",
+                         "conversation_key": Message.conversation_key_for(a, b)})
+        db.execute(insert(Message), rows)
+        db.commit()
+
+
+def read_page(db: Session, a: int, b: int) -> None:
+    db.exec(
+        select(Message)
+        .where(Message.conversation_key == Message.conversation_key_for(a, b))
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(50)
+    ).all()
+
+
+def write_message(db: Session, a: int, b: int) -> None:
+    db.add(Message(sender_id=a, receiver_id=b, text="bench",
+                   conversation_key=Message.conversation_key_for(a, b)))
+    db.commit()
+
+
+def run(engine, threads: int, write_ratio: float, seconds: float) -> dict:
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    write_engine = engine.execution_options(**sqlite_profile.WRITE)   # as database.write_engine
+
+    def worker(seed_: int):
+        rng = random.Random(seed_)
+        local = {"reads": 0, "writes": 0, "locked": 0}
+        local_lat = []
+        while time.perf_counter() < deadline:
+            a, b = rng.sample(range(1, USERS + 1), 2)
+            writing = rng.random() < write_ratio
+            started = time.perf_counter()
+            try:
+                with Session(write_engine if writing else engine) as db:
+                    (write_message if writing else read_page)(db, a, b)
+            except (exc.OperationalError, sqlite_profile.WriterLaneBusy):
+                local["locked"] += 1
+                continue
+            local_lat.append(time.perf_counter() - started)
+            local["writes" if writing else "reads"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+            latencies.extend(local_lat)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("nan")
+    return dict(counts, ops=(counts["reads"] + counts["writes"]) / elapsed, p99_ms=p99 * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g} s per profile")
+    print(f"{'profile':>8} {'ops/s':>8} {'reads':>8} {'writes':>8} {'locked':>7} {'p99 ms':>8}")
+    for profile in ("default", "wal", "lane"):
+        engine = make_engine(profile)
+        seed(engine)
+        r = run(engine, args.threads, args.write_ratio, args.seconds)
+        print(f"{profile:>8} {r['ops']:>8.0f} {r['reads']:>8} {r['writes']:>8} "
+              f"{r['locked']:>7} {r['p99_ms']:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# backend/benchmarks/bench_teacher_search.py
+"""
+Teacher search latency: the in-memory skill index vs. filtering users in SQL.
+
+    python benchmarks/bench_teacher_search.py [--users 100000] [--skills 2000] [--rounds 500]
+
+Runs against a throwaway SQLite file; nothing touches DATABASE_URL.
+
+scan   — load every teacher's skills and filter/rank in Python (what a search
+         without an index has to do, since teaching_skills is a JSON column)
+and    — index, two skills, every one required
+or     — index, two skills, any one
+prefix — index, one 2-letter prefix
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="skx-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from database import engine, init_db  # noqa: E402
+from models import User, UserStats  # noqa: E402
+from skill_index import SkillIndex, normalize  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def skill_names(count: int, rnd: random.Random) -> list:
+    return sorted({"".join(rnd.choices(LETTERS, k=rnd.randint(4, 10))) for _ in range(count)})
+
+
+def seed(users: int, skills: list, chunk: int = 20_000):
+    init_db()
+    rnd = random.Random(42)
+    # Zipf-ish popularity: a few skills are taught by many teachers
+    weights = [1 / (i + 1) for i in range(len(skills))]
+    with Session(engine) as db:
+        for start in range(0, users, chunk):
+            rows = []
+            for i in range(start, min(users, start + chunk)):
+                rows.append({
+                    "email": f"u{i}@bench.local", "name": f"u{i}", "password_hash": "x",
+                    "role": "both",
+                    "teaching_skills": list(set(rnd.choices(skills, weights, k=rnd.randint(1, 5)))),
+                })
+            db.execute(insert(User), rows)
+            db.commit()
+        db.execute(insert(UserStats), [
+            {"user_id": i, "rating_count": 1, "rating_sum": 4, "rating_mean": 4.0,
+             "rating_bayes": rnd.uniform(1, 5)}
+            for i in range(1, users + 1)
+        ])
+        db.commit()
+
+
+def scan(terms: list, limit: int = 20) -> list:
+    with Session(engine) as db:
+        rows = db.exec(
+            select(User.id, User.teaching_skills, UserStats.rating_bayes)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .where(User.role.in_(("teacher", "both")))
+        ).all()
+    wanted = set(terms)
+    hits = [(score, uid) for uid, skills, score in rows if wanted <= {normalize(s) for s in skills}]
+    return sorted(hits, reverse=True)[:limit]
+
+
+def measure(fn, queries: list) -> float:
+    """Median milliseconds per call."""
+    samples = []
+    for q in queries:
+        started = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    skills = skill_names(args.skills, rnd)
+    started = time.perf_counter()
+    seed(args.users, skills)
+    print(f"seeded {args.users:,} teachers in {time.perf_counter() - started:.1f}s")
+
+    index = SkillIndex(refresh_seconds=3600)
+    started = time.perf_counter()
+    index.ensure_loaded()
+    print(f"index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    # Queries draw from the popular end, where posting lists are longest
+    popular = skills[:50]
+    pairs = [rnd.sample(popular, 2) for _ in range(args.rounds)]
+    for q in pairs:  # first touch of a skill sorts its posting once
+        index.search(q, "or")
+    results = {
+        "scan": measure(scan, pairs[:10]),
+        "and": measure(lambda q: index.search(q, "and"), pairs),
+        "or": measure(lambda q: index.search(q, "or"), pairs),
+        "prefix": measure(lambda q: index.search([q[0][:2]], prefix=True), pairs),
+    }
+    print(f"{'query':>8} {'median ms':>10}")
+    for name, ms in results.items():
+        print(f"{name:>8} {ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# backend/benchmarks/profile_startup.py
+"""
+Cold-start profile: what `import main` costs, and how long a fresh
+uvicorn process takes to answer /health and to be ready for traffic.
+
+    python benchmarks/profile_startup.py [--top 15] [--budget-ms 1500] [--no-serve]
+
+Imports are measured with `python -X importtime` in a fresh interpreter.
+Only the eager part is on that path; routers, the DB layer, the auth stack
+and numpy load later, during warm-up (see startup.py). --budget-ms fails
+(exit 1) when `import main` exceeds it, so a heavy module-level import
+creeping back in shows up in CI. The serve step starts uvicorn on a free
+port and polls /health and / (which waits for warm-up). Runs against a
+throwaway SQLite file; nothing touches DATABASE_URL.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    tmp = tempfile.mkdtemp(prefix="skx-bench-")
+    return {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/startup.db", "PYTHONPATH": BACKEND}
+
+
+def import_times(env: dict):
+    """[(module, self_us, cumulative_us)] from -X importtime for `import main`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.005)
+    raise TimeoutError(url)
+
+
+def serve_times(env: dict, timeout: float = 60.0):
+    """Seconds from process start to the first /health 200 and the first / 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        health = _wait_for(f"http://127.0.0.1:{port}/health", deadline)
+        ready = _wait_for(f"http://127.0.0.1:{port}/", deadline)
+        return health - started, ready - started
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail if `import main` takes longer")
+    parser.add_argument("--no-serve", action="store_true", help="skip the uvicorn cold-start run")
+    args = parser.parse_args()
+    env = _env()
+
+    rows = import_times(env)
+    total_ms = next(c for name, _, c in rows if name == "main") / 1000
+    print(f"import main: {total_ms:.0f} ms ({len(rows)} modules)\n")
+    print(f"{'self ms':>8} {'cum ms':>8}  module (top {args.top} by self time)")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>8.1f}  {name}")
+
+    if not args.no_serve:
+        health, ready = serve_times(env)
+        print(f"\nuvicorn cold start: /health after {health * 1000:.0f} ms, ready after {ready * 1000:.0f} ms")
+
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"\nimport main exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# backend/benchmarks/stress_credit_ledger.py
+"""
+Concurrency stress for credit movements: legacy read-modify-write vs the ledger.
+
+    python benchmarks/stress_credit_ledger.py [--workers 16] [--requests 200] [--url URL]
+
+Without --url it runs against a throwaway SQLite file. Point --url at a
+scratch Postgres database to exercise real row locking (tables are created,
+never dropped).
+
+overdraw — parallel 5-credit bookings against a 20-credit balance
+award    — parallel /end calls for one session (the award must land once)
+lost     — parallel +1 credits to one user (every increment must survive)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--workers", type=int, default=16)
+parser.add_argument("--requests", type=int, default=200)
+parser.add_argument("--url", default=None)
+args = parser.parse_args()
+
+# DATABASE_URL must be set before the engine is imported
+os.environ["DATABASE_URL"] = args.url or f"sqlite:///{tempfile.mkdtemp(prefix='skx-bench-')}/bench.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import exc, func  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+import credits  # noqa: E402
+from database import engine, init_db, write_engine  # noqa: E402
+from models import CreditLedger, User  # noqa: E402
+
+RUN = str(int(time.time() * 1000))  # keeps keys unique across runs on a shared DB
+
+
+def new_user(balance: int) -> int:
+    with Session(engine) as db:
+        user = User(email=f"stress-{RUN}-{time.perf_counter_ns()}@bench.local", name="s",
+                    password_hash="x", credit_points=balance)
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def balance_of(user_id: int) -> int:
+    with Session(engine) as db:
+        return db.get(User, user_id).credit_points
+
+
+def ledger_sum(user_id: int) -> int:
+    with Session(engine) as db:
+        return db.exec(
+            select(func.coalesce(func.sum(CreditLedger.delta), 0)).where(CreditLedger.user_id == user_id)
+        ).one()
+
+
+# ───────────────────────────────────────────────
+# The two implementations under test
+# ───────────────────────────────────────────────
+def legacy_move(user_id: int, delta: int, key: str) -> bool:
+    with Session(engine) as db:
+        user = db.get(User, user_id)
+        if user.credit_points + delta < 0:
+            return False
+        time.sleep(0.001)  # request work between read and write widens the race window
+        user.credit_points += delta
+        db.add(user)
+        try:
+            db.commit()
+        except exc.OperationalError:   # SQLite: the read snapshot went stale ("database is locked")
+            return False
+        return True
+
+
+def ledger_move(user_id: int, delta: int, key: str) -> bool:
+    with Session(write_engine) as db:   # what a POST route gets from get_session
+        try:
+            applied = credits.apply(db, user_id, delta, "stress", key)
+        except credits.InsufficientCredits:
+            db.rollback()
+            return False
+        db.commit()
+        return applied is not None
+
+
+def run(move, user_id: int, calls, workers: int) -> int:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda c: move(user_id, *c), calls))
+
+
+def scenario(name: str, move, workers: int, requests: int):
+    """(summary, correct). Ledger runs must also reconcile: opening + Σ ledger = balance."""
+    tag = f"{RUN}:{move.__name__}:{name}"
+    if name == "overdraw":
+        opening, calls = 20, [(-5, f"{tag}:{i}") for i in range(requests)]
+    elif name == "award":
+        opening, calls = 0, [(10, f"{tag}:session-1")] * requests
+    else:
+        opening, calls = 0, [(1, f"{tag}:{i}") for i in range(requests)]
+
+    user_id = new_user(opening)
+    ok = run(move, user_id, calls, workers)
+    final = balance_of(user_id)
+
+    if name == "overdraw":
+        expected = opening - 5 * ok
+        summary = f"{ok} bookings accepted, balance {final} (expected {expected}, at most 4 bookings)"
+        correct = ok <= 4 and final == expected
+    elif name == "award":
+        expected = 10
+        summary = f"{ok} awards applied, balance {final} (expected {expected})"
+        correct = ok == 1 and final == expected
+    else:
+        expected = requests
+        summary = f"{ok} increments acknowledged, balance {final} (expected {expected})"
+        correct = final == expected
+    if move is ledger_move:
+        correct = correct and opening + ledger_sum(user_id) == final
+    return summary, correct
+
+
+def main():
+    init_db()
+    failed = False
+    for name in ("overdraw", "award", "lost"):
+        for move in (legacy_move, ledger_move):
+            started = time.perf_counter()
+            summary, correct = scenario(name, move, args.workers, args.requests)
+            label = move.__name__.split("_")[0]
+            print(f"{name:>8} {label:>7}  {'OK  ' if correct else 'FAIL'}  {summary}"
+                  f"  [{time.perf_counter() - started:.2f}s]")
+            failed |= move is ledger_move and not correct
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
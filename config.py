@@ -7,12 +7,126 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Settings(BaseSettings):
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./skillxchange.db")
+    # Optional read-only replica for read-heavy endpoints (see read_routing.py)
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    # After a write, that user's reads stay on the primary this long (replica lag).
+    # Carried by a cookie across workers; cross-site frontends must send credentials.
+    REPLICA_STICKY_SECONDS: float = 5.0
+
+    # Connection pools (per engine, per worker process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0       # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800         # reconnect connections older than this (-1 = never)
+    DB_POOL_PRE_PING: bool = True       # test each connection on checkout
+    DB_POOL_USE_LIFO: bool = False      # reuse the newest connection so idle ones can expire
+
+    # SQLite profile (local / small deployments), applied to every new connection
+    SQLITE_WAL: bool = True                      # readers and the writer stop blocking each other
+    SQLITE_SYNCHRONOUS: str = "NORMAL"           # durable with WAL except on power loss
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WRITER_LANE: bool = True              # one writing transaction at a time per process
+    SQLITE_RETRY_AFTER_SECONDS: int = 1          # Retry-After on the 503 when the lane wait times out
+
+    # Schema: startup only checks the version; `python migrations.py` upgrades.
+    # SQLite databases are always upgraded at startup.
+    SCHEMA_AUTO_MIGRATE: bool = False
+
+    # Cold start: routers/DB load after uvicorn is up; other requests wait this long for them
+    STARTUP_GATE_TIMEOUT_SECONDS: float = 30.0
 
     SECRET_KEY: str = os.getenv("JWT_SECRET", "local-dev-secret-2025")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
 
+    # Authenticated-principal cache (0 disables it)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10_000
+
+    # /metrics: bearer token required when set; without one only loopback clients may read it
+    METRICS_TOKEN: str = ""
+
+    # Password hashing pool (argon2 is CPU/memory heavy)
+    HASH_POOL_KIND: str = "process"        # process | thread
+    HASH_POOL_WORKERS: int = 0             # 0 → os.cpu_count()
+    HASH_POOL_MAX_QUEUE: int = 32          # waiting hashes before answering 503
+    HASH_POOL_RETRY_AFTER_SECONDS: int = 1
+
+    # /api/users paging
+    USERS_PAGE_SIZE: int = 50
+    USERS_PAGE_SIZE_MAX: int = 200
+    USERS_EXPORT_BATCH: int = 1000
+
+    # Chat history paging
+    CHAT_HISTORY_PAGE_SIZE: int = 50
+    CHAT_HISTORY_PAGE_SIZE_MAX: int = 200
+
+    # Credit economy (every change is recorded in the credit ledger)
+    SESSION_COST_CREDITS: int = 5
+    SESSION_AWARD_CREDITS: int = 10
+
+    # Teacher ranking: Bayesian-smoothed rating = (sum + W·M) / (count + W)
+    RATING_PRIOR_MEAN: float = 3.5
+    RATING_PRIOR_WEIGHT: float = 5.0
+
+    # Session lists (pending requests, history) paging
+    SESSIONS_PAGE_SIZE: int = 50
+    SESSIONS_PAGE_SIZE_MAX: int = 200
+
+    # Teacher search: in-memory skill index, rebuilt from the DB this often
+    SKILL_INDEX_REFRESH_SECONDS: float = 300.0
+    TEACHER_SEARCH_PAGE_SIZE: int = 20
+    TEACHER_SEARCH_PAGE_SIZE_MAX: int = 100
+
+    # Recommended teachers: score = overlap·W_o + mutual·W_m + rating·W_r + recency·W_a
+    # (each term scaled to 0‥1); recency halves every MATCH_RECENCY_HALF_LIFE_DAYS
+    MATCH_WEIGHT_OVERLAP: float = 1.0
+    MATCH_WEIGHT_MUTUAL: float = 0.5
+    MATCH_WEIGHT_RATING: float = 0.3
+    MATCH_WEIGHT_RECENCY: float = 0.2
+    MATCH_RECENCY_HALF_LIFE_DAYS: float = 30.0
+    MATCH_RESULTS: int = 50                   # ranked list kept per learner
+    MATCH_CACHE_SIZE: int = 10_000            # learners whose lists are cached
+    MATCH_REFRESH_SECONDS: float = 300.0
+
+    # Chat write-behind batching
+    CHAT_BATCH_INTERVAL_MS: int = 50
+    CHAT_BATCH_MAX_SIZE: int = 200
+    CHAT_WRITE_QUEUE_MAX: int = 10_000
+
+    # WebSocket fan-out: peers slower than this per send are evicted
+    WS_SEND_TIMEOUT_SECONDS: float = 5.0
+    # Per-connection outbound queue and what to do when it fills up
+    WS_SEND_QUEUE_MAX: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"    # drop_oldest | coalesce_ice | disconnect
+
+    # Cross-worker rooms: "memory" (single process) or "redis" (REDIS_URL)
+    WS_BACKPLANE: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    WS_MEMBER_TTL_SECONDS: float = 60.0
+
+    # Signaling frames: "relay" forwards raw frames untouched (msgpack negotiable),
+    # "json" is the old parse + re-encode path
+    SIGNALING_FRAME_MODE: str = "relay"
+    # Trickled ICE candidates for one recipient arriving within this window are
+    # sent as a single {"type": "ice-candidates"} frame (0 disables). Only peers
+    # that joined with ?ice_batch=1 get batches (also under coalesce_ice).
+    ICE_COALESCE_WINDOW_MS: int = 0
+    WS_LOG_SAMPLE_SECONDS: float = 10.0
+
+    # Signaling rooms: only the accepted session's teacher + learner may join
+    SIGNALING_ROOM_CAPACITY: int = 2
+    ROOM_ADMISSION_MAX_ENTRIES: int = 50_000
+    # Admitted rooms are re-read from the DB this often (revocations are per process)
+    ROOM_ADMISSION_TTL_SECONDS: float = 30.0
+    ROOM_ADMISSION_NEGATIVE_TTL_SECONDS: float = 5.0
+
+    # Pending-request counters are reloaded from the DB at most this often
+    NOTIFY_RECONCILE_SECONDS: float = 300.0
+
     CLOUDINARY_URL: str = os.getenv("CLOUDINARY_URL", "")
 
     # Store origins as a RAW STRING so pydantic does NOT parse as JSON
@@ -47,5 +161,9 @@ class Settings(BaseSettings):
         super().__init__(**kwargs)
         if self.DATABASE_URL.startswith("postgres://"):
             self.DATABASE_URL = self.DATABASE_URL.replace("postgres://", "postgresql+psycopg2://", 1)
+        if self.DATABASE_REPLICA_URL.startswith("postgres://"):
+            self.DATABASE_REPLICA_URL = self.DATABASE_REPLICA_URL.replace(
+                "postgres://", "postgresql+psycopg2://", 1
+            )
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,71 @@
+# backend/credits.py
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from database import violated_unique
+from metrics import metrics
+from models import CreditLedger, User
+
+# The ledger's unique idempotency_key as each dialect reports it (see database.violated_unique)
+IDEMPOTENCY_CONSTRAINTS = frozenset({"creditledger_idempotency_key_key", "creditledger.idempotency_key"})
+
+
+class InsufficientCredits(Exception):
+    """The conditional debit matched no row — the balance does not cover it."""
+
+
+def session_key(session_id: int, transition: str) -> str:
+    """Idempotency key for one credit movement of one session (book/award/refund)."""
+    return f"session:{session_id}:{transition}"
+
+
+def apply(
+    db: Session,
+    user_id: int,
+    delta: int,
+    reason: str,
+    key: str,
+    session_id: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Move `delta` credits inside the caller's transaction, without reading the
+    balance first.
+
+    The ledger row is written first so its unique key claims the transition;
+    the balance then changes with a single conditional UPDATE
+    (credit_points >= n for debits). Returns the new balance, or None when
+    `key` was already applied. Raises InsufficientCredits and writes nothing
+    when a debit is not covered.
+    """
+    savepoint = db.begin_nested()
+    entry = CreditLedger(
+        user_id=user_id, delta=delta, reason=reason, session_id=session_id, idempotency_key=key
+    )
+    try:
+        db.add(entry)
+        db.flush()
+    except IntegrityError as e:
+        savepoint.rollback()
+        if violated_unique(e) not in IDEMPOTENCY_CONSTRAINTS:
+            raise   # unknown user/session, NOT NULL … — not a replay
+        metrics.inc("credits.duplicate")
+        return None
+
+    stmt = update(User).where(User.id == user_id)
+    if delta < 0:
+        stmt = stmt.where(User.credit_points >= -delta)
+    balance = db.execute(
+        stmt.values(credit_points=User.credit_points + delta).returning(User.credit_points)
+    ).scalar_one_or_none()
+    if balance is None:
+        savepoint.rollback()
+        metrics.inc("credits.insufficient")
+        raise InsufficientCredits()
+
+    entry.balance_after = balance
+    savepoint.commit()
+    metrics.inc(f"credits.{reason}")
+    return balance
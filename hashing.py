@@ -0,0 +1,132 @@
+# backend/hashing.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from config import settings
+from metrics import metrics
+
+logger = logging.getLogger("hashing")
+
+# ───────────────────────────────────────────────
+# Worker-side functions (must be module level so a process pool can pickle them)
+# ───────────────────────────────────────────────
+_hasher = None
+
+
+def _get_hasher():
+    global _hasher
+    if _hasher is None:
+        from pwdlib import PasswordHash
+        _hasher = PasswordHash.recommended()
+    return _hasher
+
+
+def _hash(password: str) -> str:
+    return _get_hasher().hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return _get_hasher().verify(password, hashed)
+
+
+def _load() -> None:
+    _get_hasher()
+
+
+class PoolSaturated(Exception):
+    """Raised when the hashing queue is full — callers should answer 503."""
+
+
+class HashingPool:
+    """
+    Dedicated executor for argon2 work with a bounded admission queue.
+
+    At most `workers` hashes run at once and at most `max_queue` more may wait;
+    anything beyond that is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, max_queue)
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "thread":
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="hash"
+                        )
+                    else:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    logger.info(f"Hashing pool started ({self.kind}, {self.workers} workers)")
+        return self._executor
+
+    def _admit(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            metrics.inc("hash.rejected")
+            raise PoolSaturated()
+        with self._lock:
+            self._pending += 1
+            metrics.set_gauge("hash.queue_depth", self._pending)
+
+    def _release(self, started: float, op: str) -> None:
+        metrics.observe(f"hash.{op}_seconds", time.perf_counter() - started)
+        with self._lock:
+            self._pending -= 1
+            metrics.set_gauge("hash.queue_depth", self._pending)
+        self._slots.release()
+
+    def _submit(self, op: str, fn, *args):
+        self._admit()
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(started, op)
+            raise
+        future.add_done_callback(lambda _: self._release(started, op))
+        return future
+
+    # Blocking API — for sync routes already running in the threadpool
+    def hash(self, password: str) -> str:
+        return self._submit("hash", _hash, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._submit("verify", _verify, password, hashed).result()
+
+    # Awaitable API — for async routes, never blocks the event loop
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit("hash", _hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit("verify", _verify, password, hashed))
+
+    def warm(self) -> None:
+        """Start the workers and load argon2 in them now, not on the first login."""
+        executor = self._get_executor()
+        for future in [executor.submit(_load) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+hashing_pool = HashingPool(
+    kind=settings.HASH_POOL_KIND,
+    workers=settings.HASH_POOL_WORKERS or (os.cpu_count() or 2),
+    max_queue=settings.HASH_POOL_MAX_QUEUE,
+)
@@ -1,12 +1,17 @@
 # backend/main.py
+from startup import startup_report   # first, so the import phase is timed
 
+import asyncio
 import os
-from fastapi import FastAPI
+import secrets
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from config import settings
-from database import init_db
+from metrics import metrics
+from startup import ReadinessGate, readiness
 
 # ──────────────────────────────
 # 1. Create app FIRST
@@ -21,8 +26,18 @@ app = FastAPI(
 )
 
 # ──────────────────────────────
-# 2. CORS (must be BEFORE routers)
+# 2. Readiness gate, then CORS (both BEFORE routers)
 # ──────────────────────────────
+# Only /health (and /metrics) are served before the routers below have
+# loaded. Successful writes pin the caller's reads to the primary (read
+# replica lag); that middleware needs the DB layer, so it joins then.
+def _after_warmup(inner):
+    from read_routing import StickyWritesMiddleware
+    return StickyWritesMiddleware(inner)
+
+app.add_middleware(ReadinessGate, wrap=_after_warmup)
+
+# Added last, so outermost: preflights and the gate's 503 carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -45,49 +60,93 @@ if not os.path.exists("uploads"):
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
-# ──────────────────────────────
-# 4. Import routers (AFTER app + CORS exist)
-# ──────────────────────────────
-from routes import (
-    auth_router,
-    users_router,
-    profile_router,
-    sessions_router,
-    ratings_router,
-    signaling_router,
-    teachers_router,
-    chat_router,
-)
+startup_report.mark("imports")
 
 # ──────────────────────────────
-# 5. Register routers
+# 4. Deferred startup: routers, DB, warm-up
+#    (uvicorn accepts connections without waiting for any of this)
 # ──────────────────────────────
-app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(profile_router)
-app.include_router(sessions_router)
-app.include_router(ratings_router)
-app.include_router(signaling_router)
-app.include_router(teachers_router)
-app.include_router(chat_router)
+def _load():
+    """Everything /health does not need. Runs on a worker thread."""
+    with startup_report.phase("imports_deferred"):
+        import routes   # auth (jose), hashing, schemas (email-validator), models, numpy …
+        import migrations
+        from database import engine
+    with startup_report.phase("db_connect"):
+        engine.connect().close()   # first connection; the schema check reuses it from the pool
+    with startup_report.phase("schema_check"):
+        migrations.ensure_current(engine)
+    with startup_report.phase("warm"):
+        from auth import warm
+        from hashing import hashing_pool
+        from matchmaking import matchmaker
+        from skill_index import skill_index
+        warm()
+        hashing_pool.warm()
+        skill_index.ensure_loaded()
+        matchmaker.ensure_loaded()
+    return routes
+
+
+async def _warm():
+    try:
+        routes = await asyncio.to_thread(_load)
+        if not getattr(app.state, "routers_loaded", False):   # startup may run again (tests)
+            for name in routes.__all__:
+                app.include_router(getattr(routes, name))
+            app.state.routers_loaded = True
+        await start_realtime()
+    except Exception as e:
+        print(f"❌ Startup failed: {e!r}")
+        readiness.finish(e)
+        return
+    readiness.finish()
+    print(f"⏱️  Startup: {startup_report.summary()}")
+
+
+async def start_realtime():
+    from message_batcher import message_batcher
+    from notifications import notification_hub
+    from websocket_manager import manager, chat_manager, notification_manager
+    with startup_report.phase("realtime"):
+        await manager.start()
+        await chat_manager.start()
+        await notification_manager.start()
+        await message_batcher.start()
+        notification_hub.bind(asyncio.get_running_loop())
 
 # ──────────────────────────────
-# 6. Startup tasks
+# 5. Startup / shutdown
 # ──────────────────────────────
 @app.on_event("startup")
-def on_startup():
-    init_db()
+async def on_startup():
+    readiness.begin()
+    app.state.warmup = asyncio.create_task(_warm())
     print("🚀 SkillXchange Backend Online")
 
-@app.on_event("startup")
-async def create_message_table():
-    from database import engine
-    from models import Message
-    Message.metadata.create_all(bind=engine, checkfirst=True)
-    print("💬 Message table ready")
+@app.on_event("shutdown")
+async def stop_realtime():
+    if not readiness.ready:
+        return
+    from message_batcher import message_batcher
+    from websocket_manager import manager, chat_manager, notification_manager
+    await message_batcher.stop()
+    await notification_manager.stop()
+    await chat_manager.stop()
+    await manager.stop()
+
+@app.on_event("shutdown")
+async def close_engines():
+    from database import dispose_engines
+    await dispose_engines()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    from hashing import hashing_pool
+    hashing_pool.shutdown()
 
 # ──────────────────────────────
-# 7. Health / root
+# 6. Health / root
 # ──────────────────────────────
 @app.get("/")
 def root():
@@ -98,5 +157,22 @@ def root():
     }
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():   # async: no threadpool hop while warm-up holds a thread
+    # Served during warm-up; 503 only when warm-up failed, so the platform restarts us
+    if readiness.failed:
+        return JSONResponse({"status": "failed", "ready": False}, status_code=503)
+    return {"status": "ok", "ready": readiness.ready}
+
+# Internal counters: METRICS_TOKEN as a bearer token, or loopback only when unset
+LOOPBACK = frozenset({"127.0.0.1", "::1", "localhost"})
+
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        allowed = scheme.lower() == "bearer" and secrets.compare_digest(token, settings.METRICS_TOKEN)
+    else:
+        allowed = request.client is not None and request.client.host in LOOPBACK
+    if not allowed:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return metrics.snapshot()
@@ -0,0 +1,256 @@
+# backend/matchmaking.py
+"""
+Learner → teacher recommendations.
+
+Every user is a column in two bitset matrices (uint64 words, one bit per
+skill): what they teach and what they want to learn. Matrices are stored
+word-major, so ranking all teachers for one learner is a few contiguous
+NumPy ops over just the words the learner has bits in:
+
+    overlap = popcount(TEACH & learner.learn)   teacher covers the learner's interests
+    mutual  = popcount(LEARN & learner.teach)   teacher wants what the learner teaches
+
+plus rating (UserStats.rating_bayes) and recency (last activity) columns.
+Results are cached per learner under a version number; profile changes
+bump the version, so every cached list is recomputed on its next read.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from config import settings
+from database import engine
+from metrics import metrics
+from models import User, UserStats
+from skill_index import TEACHER_ROLES, normalize
+
+logger = logging.getLogger("matchmaking")
+
+WORD_BITS = 64
+
+
+class Match(NamedTuple):
+    user_id: int
+    score: float
+    overlap: int     # learner interests this teacher teaches
+    mutual: int      # learner skills this teacher wants to learn
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value is not None else 0.0
+
+
+class _Matrix:
+    """Word-major bitsets (words × users) + per-user arrays, grown by doubling."""
+
+    def __init__(self, capacity: int = 16):
+        capacity = max(capacity, 16)
+        self.vocab: Dict[str, int] = {}
+        self.row: Dict[int, int] = {}
+        self.n = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.teach = np.zeros((1, capacity), dtype=np.uint64)
+        self.learn = np.zeros((1, capacity), dtype=np.uint64)
+        self.is_teacher = np.zeros(capacity, dtype=bool)
+        self.rating = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=np.float64)
+
+    def _grow_rows(self) -> None:
+        extra = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.zeros(extra, dtype=np.int64)])
+        self.teach = np.hstack([self.teach, np.zeros_like(self.teach)])
+        self.learn = np.hstack([self.learn, np.zeros_like(self.learn)])
+        self.is_teacher = np.concatenate([self.is_teacher, np.zeros(extra, dtype=bool)])
+        self.rating = np.concatenate([self.rating, np.zeros(extra)])
+        self.active = np.concatenate([self.active, np.zeros(extra)])
+
+    def bits(self, skills: Iterable[str]) -> np.ndarray:
+        """Skill names → one user's bitset, growing the vocabulary (and word count) as needed."""
+        columns = set()
+        for skill in skills or ():
+            key = normalize(skill) if skill else ""
+            if key:
+                columns.add(self.vocab.setdefault(key, len(self.vocab)))
+        words = self.teach.shape[0]
+        needed = len(self.vocab) // WORD_BITS + 1
+        if needed > words:
+            pad = ((0, needed - words), (0, 0))
+            self.teach = np.pad(self.teach, pad)
+            self.learn = np.pad(self.learn, pad)
+            words = needed
+        row = np.zeros(words, dtype=np.uint64)
+        for column in columns:
+            row[column // WORD_BITS] |= np.uint64(1 << (column % WORD_BITS))
+        return row
+
+    def put(self, user_id: int, role, teaching, learning, rating: Optional[float], active: float) -> None:
+        i = self.row.get(user_id)
+        if i is None:
+            if self.n == len(self.ids):
+                self._grow_rows()
+            i = self.row[user_id] = self.n
+            self.n += 1
+            self.ids[i] = user_id
+            self.rating[i] = settings.RATING_PRIOR_MEAN
+        teach, learn = self.bits(teaching), self.bits(learning)
+        self.teach[:, i] = 0
+        self.teach[:len(teach), i] = teach   # learn may have added a word after teach
+        self.learn[:, i] = learn
+        self.is_teacher[i] = role in TEACHER_ROLES
+        if rating is not None:
+            self.rating[i] = rating
+        self.active[i] = max(self.active[i], active)
+
+
+class Matchmaker:
+    def __init__(self, refresh_seconds: float, cache_size: int, results: int):
+        self.refresh_seconds = refresh_seconds
+        self.cache_size = cache_size
+        self.results = results
+        self._lock = threading.RLock()
+        self._m = _Matrix()
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()   # user_id → (version, [Match])
+        self._version = 0
+        self._loaded_at: Optional[float] = None
+        self._rebuilding = False
+
+    # ───────────────────────────────────────────────
+    # Loading (same lazy load + background refresh as skill_index)
+    # ───────────────────────────────────────────────
+    def ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            with self._lock:
+                if self._loaded_at is None:
+                    self._swap(self._build())
+        elif time.monotonic() - self._loaded_at > self.refresh_seconds and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._refresh, name="matchmaking-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            self._swap(self._build())
+        except Exception as e:
+            logger.error(f"Matchmaking rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+
+    @staticmethod
+    def _build() -> _Matrix:
+        started = time.perf_counter()
+        with Session(engine) as db:
+            rows = db.exec(
+                select(
+                    User.id, User.role, User.teaching_skills, User.learning_interests,
+                    UserStats.rating_bayes,
+                    func.coalesce(UserStats.updated_at, User.created_at),
+                ).outerjoin(UserStats, UserStats.user_id == User.id)
+            ).all()
+        m = _Matrix(capacity=len(rows))
+        for user_id, role, teaching, learning, rating, active in rows:
+            m.put(user_id, role, teaching, learning, rating, _timestamp(active))
+        metrics.observe("matchmaking.build_seconds", time.perf_counter() - started)
+        return m
+
+    def _swap(self, m: _Matrix) -> None:
+        with self._lock:
+            self._m = m
+            self._version += 1
+            self._cache.clear()
+            self._loaded_at = time.monotonic()
+
+    # ───────────────────────────────────────────────
+    # Updates — cheap no-ops until first loaded
+    # ───────────────────────────────────────────────
+    def set_user(self, user_id: int, role: Optional[str], teaching: List[str], learning: List[str]) -> None:
+        """A profile changed: rewrite its bits and invalidate every cached list."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._m.put(user_id, role, teaching, learning, None, time.time())
+            self._version += 1
+
+    def set_score(self, user_id: int, rating: float) -> None:
+        """New rating. Cached lists keep their order until the next recompute."""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            i = self._m.row.get(user_id)
+            if i is not None:
+                self._m.rating[i] = rating
+                self._m.active[i] = time.time()
+
+    # ───────────────────────────────────────────────
+    # Ranking
+    # ───────────────────────────────────────────────
+    def recommend(self, user_id: int, limit: int) -> List[Match]:
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] == self._version:
+                self._cache.move_to_end(user_id)
+                metrics.inc("matchmaking.cache_hit")
+                return cached[1][:limit]
+            metrics.inc("matchmaking.cache_miss")
+            started = time.perf_counter()
+            matches = self._rank(self._m, user_id)
+            metrics.observe("matchmaking.rank_seconds", time.perf_counter() - started)
+            self._cache[user_id] = (self._version, matches)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return matches[:limit]
+
+    def _rank(self, m: _Matrix, user_id: int) -> List[Match]:
+        me = m.row.get(user_id)
+        if me is None:
+            return []
+        n = m.n
+        wants, gives = m.learn[:, me], m.teach[:, me]
+        want_count = int(np.bitwise_count(wants).sum())
+        if want_count == 0:
+            return []
+        give_count = int(np.bitwise_count(gives).sum())
+
+        overlap = np.zeros(n, dtype=np.int32)
+        for w in np.flatnonzero(wants):
+            overlap += np.bitwise_count(m.teach[w, :n] & wants[w])
+        candidates = m.is_teacher[:n] & (overlap > 0)
+        candidates[me] = False
+        rows = np.flatnonzero(candidates)
+        if rows.size == 0:
+            return []
+
+        overlap = overlap[rows]
+        mutual = np.zeros(rows.size, dtype=np.int32)
+        for w in np.flatnonzero(gives):
+            mutual += np.bitwise_count(m.learn[w, rows] & gives[w])
+        half_life = settings.MATCH_RECENCY_HALF_LIFE_DAYS * 86400.0
+        score = settings.MATCH_WEIGHT_OVERLAP * (overlap / want_count)
+        if give_count:
+            score += settings.MATCH_WEIGHT_MUTUAL * (mutual / give_count)
+        score += settings.MATCH_WEIGHT_RATING * np.clip((m.rating[rows] - 1.0) / 4.0, 0.0, 1.0)
+        score += settings.MATCH_WEIGHT_RECENCY * np.exp2(
+            -np.maximum(time.time() - m.active[rows], 0.0) / half_life
+        )
+
+        k = min(self.results, rows.size)
+        top = np.argpartition(-score, k - 1)[:k] if rows.size > k else np.arange(rows.size)
+        top = top[np.lexsort((m.ids[rows[top]], -score[top]))]  # score desc, then id
+        return [
+            Match(int(m.ids[rows[j]]), float(score[j]), int(overlap[j]), int(mutual[j]))
+            for j in top
+        ]
+
+
+# Singleton instance
+matchmaker = Matchmaker(
+    refresh_seconds=settings.MATCH_REFRESH_SECONDS,
+    cache_size=settings.MATCH_CACHE_SIZE,
+    results=settings.MATCH_RESULTS,
+)
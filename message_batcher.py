@@ -0,0 +1,132 @@
+# backend/message_batcher.py
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from config import settings
+from database import write_engine
+from metrics import metrics
+from models import Message
+from read_routing import note_write
+
+logger = logging.getLogger("chat")
+
+
+class QueueFull(Exception):
+    """The write-behind queue is at capacity — the message was not accepted."""
+
+
+class MessageBatcher:
+    """
+    Write-behind persistence for chat messages.
+
+    submit() returns immediately with a future; a background task groups queued
+    rows into one bulk INSERT every `interval_ms` or `max_batch` rows, whichever
+    comes first, and resolves each future with the stored message id.
+    """
+
+    def __init__(self, interval_ms: int, max_batch: int, max_queue: int):
+        self.interval = interval_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.put(None)  # sentinel — drained after every real row
+        await self._task
+        self._task = None
+        self._queue = None
+
+    def submit(self, values: dict) -> asyncio.Future:
+        if self._queue is None:
+            raise RuntimeError("MessageBatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((values, future))
+        except asyncio.QueueFull:
+            metrics.inc("chat.write_rejected")
+            raise QueueFull()
+        metrics.set_gauge("chat.write_queue_depth", self._queue.qsize())
+        return future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            metrics.set_gauge("chat.write_queue_depth", self._queue.qsize())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        rows = [values for values, _ in batch]
+        started = time.perf_counter()
+        try:
+            ids = await asyncio.to_thread(self._insert, rows)
+        except Exception as e:
+            if len(batch) > 1:
+                # Isolate the bad row(s) so one failure doesn't fail the whole batch
+                logger.warning(f"Bulk insert of {len(batch)} messages failed ({e}); retrying row by row")
+                for item in batch:
+                    await self._flush([item])
+                return
+            metrics.inc("chat.write_failed")
+            logger.error(f"Message insert failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Both sides' next history read must include these rows
+        note_write(*{u for r in rows for u in (r["sender_id"], r["receiver_id"])})
+        metrics.inc("chat.messages_written", len(ids))
+        metrics.observe("chat.batch_write_seconds", time.perf_counter() - started)
+        for (_, future), msg_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(msg_id)
+
+    @staticmethod
+    def _insert(rows: List[dict]) -> List[int]:
+        with Session(write_engine) as db:
+            ids = db.scalars(
+                insert(Message).returning(Message.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+            db.commit()
+            return list(ids)
+
+
+# Singleton instance
+message_batcher = MessageBatcher(
+    interval_ms=settings.CHAT_BATCH_INTERVAL_MS,
+    max_batch=settings.CHAT_BATCH_MAX_SIZE,
+    max_queue=settings.CHAT_WRITE_QUEUE_MAX,
+)
@@ -0,0 +1,48 @@
+# backend/metrics.py
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """Tiny in-process metrics registry (counters, gauges, timings)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        # name → {"count", "total", "max"} in seconds
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            t = self.timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            t["count"] += 1
+            t["total"] += seconds
+            if seconds > t["max"]:
+                t["max"] = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "timings": {
+                    name: {
+                        **t,
+                        "avg": t["total"] / t["count"] if t["count"] else 0.0,
+                    }
+                    for name, t in self.timings.items()
+                },
+            }
+
+
+# Singleton instance
+metrics = Metrics()
@@ -0,0 +1,215 @@
+# backend/migrations.py
+"""
+Versioned schema.
+
+The database records the schema version it is at in `schema_version` (one
+row). App startup reads only that row (ensure_current) instead of running
+create_all, which reflects every table on every cold start. Migrations run
+out of band, before the new code starts serving:
+
+    python migrations.py            # upgrade to SCHEMA_VERSION
+    python migrations.py --status   # print database vs. code version
+
+Render runs this as the preDeployCommand. Local SQLite databases (and
+SCHEMA_AUTO_MIGRATE=true) are upgraded at startup instead, so a fresh
+checkout still just runs.
+
+Each step is idempotent: it checks before it changes anything, so
+re-running one against a database created by an older create_all is safe.
+Add new steps to the end of MIGRATIONS; never edit one that has shipped.
+"""
+import argparse
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, delete, exc, func, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+import sqlite_profile
+from config import settings
+from models import Rating, STATUS_COMPLETED, Session, UserStats
+
+logger = logging.getLogger("migrations")
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+# ───────────────────────────────────────────────
+# Steps
+# ───────────────────────────────────────────────
+def _create_tables(conn: Connection) -> None:
+    # Fresh databases get the whole current schema here; later steps are no-ops for them
+    SQLModel.metadata.create_all(conn, checkfirst=True)
+
+
+def _message_conversation_key(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("message")}
+    if "conversation_key" not in columns:
+        conn.execute(text("ALTER TABLE message ADD COLUMN conversation_key VARCHAR"))
+    conn.execute(text(
+        "UPDATE message SET conversation_key = "
+        "CAST(CASE WHEN sender_id < receiver_id THEN sender_id ELSE receiver_id END AS VARCHAR)"
+        " || ':' || "
+        "CAST(CASE WHEN sender_id < receiver_id THEN receiver_id ELSE sender_id END AS VARCHAR) "
+        "WHERE conversation_key IS NULL"
+    ))
+    if conn.dialect.name != "sqlite":   # SQLite cannot tighten an existing column
+        conn.execute(text("ALTER TABLE message ALTER COLUMN conversation_key SET NOT NULL"))
+    # Message.text used to be indexed; nothing searches it
+    conn.execute(text("DROP INDEX IF EXISTS ix_message_text"))
+
+
+def _indexes_and_constraints(conn: Connection) -> None:
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+    inspector = inspect(conn)
+    unique_sets = [set(u["column_names"]) for u in inspector.get_unique_constraints("rating")]
+    unique_sets += [set(i["column_names"]) for i in inspector.get_indexes("rating") if i["unique"]]
+    if {"session_id", "rater_id"} not in unique_sets:
+        # Keep the first rating of any duplicate (session, rater) pair — the API never allowed more
+        first = select(func.min(Rating.id)).group_by(Rating.session_id, Rating.rater_id)
+        conn.execute(delete(Rating).where(Rating.id.not_in(first.scalar_subquery())))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_rating_session_rater ON rating (session_id, rater_id)"
+        ))
+
+
+def _backfill_user_stats(conn: Connection) -> None:
+    """Rebuild UserStats from Rating and Session (tables created before it only had live updates)."""
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    prior_mass = prior_weight * settings.RATING_PRIOR_MEAN
+
+    ratings = {
+        user_id: (count, total)
+        for user_id, count, total in conn.execute(
+            select(Rating.ratee_id, func.count(), func.sum(Rating.rating)).group_by(Rating.ratee_id)
+        )
+    }
+    completed = Counter()
+    for column in (Session.teacher_id, Session.learner_id):
+        for user_id, count in conn.execute(
+            select(column, func.count()).where(Session.status == STATUS_COMPLETED).group_by(column)
+        ):
+            completed[user_id] += count
+
+    now = datetime.utcnow()
+    rows = []
+    for user_id in ratings.keys() | completed.keys():
+        count, total = ratings.get(user_id, (0, 0))
+        rows.append({
+            "user_id": user_id,
+            "rating_count": count,
+            "rating_sum": total,
+            "rating_mean": total / count if count else 0.0,
+            "rating_bayes": (total + prior_mass) / (count + prior_weight),
+            "sessions_completed": completed[user_id],
+            "updated_at": now,
+        })
+    conn.execute(delete(UserStats))
+    if rows:
+        conn.execute(insert(UserStats), rows)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create missing tables", _create_tables),
+    Migration(2, "message.conversation_key (backfilled), drop ix_message_text", _message_conversation_key),
+    Migration(3, "session/message indexes, one rating per (session, rater)", _indexes_and_constraints),
+    Migration(4, "backfill user_stats", _backfill_user_stats),
+]
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+# ───────────────────────────────────────────────
+# Version check / upgrade
+# ───────────────────────────────────────────────
+def current_version(conn: Connection) -> Optional[int]:
+    """The database's schema version (a single-row read); None if it was never migrated."""
+    try:
+        return conn.execute(select(schema_version.c.version)).scalar()
+    except exc.DBAPIError:
+        conn.rollback()   # Postgres aborts the transaction on a missing table
+        return None
+
+
+# Any constant shared by every process that migrates this database
+ADVISORY_LOCK_KEY = 0x736B786D6967   # "skxmig"
+
+
+def _lock(conn: Connection) -> None:
+    """
+    Hold the migration lock until this transaction ends. Postgres takes an
+    advisory lock; SQLite transactions from the WRITE engine already began
+    with BEGIN IMMEDIATE (sqlite_profile), which excludes other writers.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+def upgrade(engine: Engine) -> int:
+    """
+    Apply every pending migration, each in its own transaction with its
+    version bump. Each transaction takes the migration lock and re-reads the
+    version first, so concurrent upgrades (several workers auto-migrating,
+    a deploy racing a local run) apply every step exactly once.
+    """
+    version = 0
+    for migration in MIGRATIONS:
+        with engine.execution_options(**sqlite_profile.WRITE).begin() as conn:
+            _lock(conn)
+            schema_version.create(conn, checkfirst=True)
+            version = current_version(conn) or 0
+            if migration.version <= version:
+                continue
+            migration.apply(conn)
+            conn.execute(delete(schema_version))
+            conn.execute(insert(schema_version).values(version=migration.version, applied_at=datetime.utcnow()))
+        logger.info(f"Schema migrated to {migration.version}: {migration.description}")
+        version = migration.version
+    return version
+
+
+def ensure_current(engine: Engine) -> int:
+    """Startup check: the database must be at SCHEMA_VERSION (or newer, mid-deploy)."""
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version is not None and version >= SCHEMA_VERSION:
+        if version > SCHEMA_VERSION:
+            logger.warning(f"Database schema {version} is newer than this build ({SCHEMA_VERSION})")
+        return version
+    if settings.SCHEMA_AUTO_MIGRATE or engine.dialect.name == "sqlite":
+        return upgrade(engine)
+    raise RuntimeError(
+        f"Database schema is at {version or 'no version'}, this build needs {SCHEMA_VERSION}: "
+        "run `python migrations.py`"
+    )
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Upgrade the database schema")
+    parser.add_argument("--status", action="store_true", help="print versions and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.status:
+        with engine.connect() as conn:
+            print(f"database: {current_version(conn)}  code: {SCHEMA_VERSION}")
+    else:
+        print(f"schema version {upgrade(engine)}")
@@ -1,6 +1,6 @@
 # backend/models.py
 from typing import Optional, List
-from sqlmodel import SQLModel, Field, Relationship, JSON
+from sqlmodel import SQLModel, Field, Relationship, JSON, Index, UniqueConstraint
 from datetime import datetime
 
 
@@ -39,16 +39,33 @@ class User(SQLModel, table=True):
     )
 
 
+# Session.status values — transitions live in session_state.py
+STATUS_PENDING = "pending_request"
+STATUS_ACTIVE = "active"
+STATUS_COMPLETED = "completed"
+STATUS_CANCELLED = "cancelled"
+STATUS_DECLINED = "declined"
+# Rows written before the statuses were unified say "pending"
+PENDING_STATUSES = (STATUS_PENDING, "pending")
+
+
 class Session(SQLModel, table=True):
+    __table_args__ = (
+        # Serves a teacher's pending requests: COUNT and the list ordered by start_time
+        Index("ix_session_teacher_status_start", "teacher_id", "status", "start_time"),
+        # Learner side of session history (teacher side uses the index above)
+        Index("ix_session_learner_start", "learner_id", "start_time"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # WebRTC & pending-requests logic
     topic: Optional[str] = None
-    room_name: Optional[str] = None
+    room_name: Optional[str] = Field(default=None, index=True)
 
     status: str = Field(
-        default="pending_request"
-    )  # values → pending_request | active | completed | declined
+        default=STATUS_PENDING
+    )  # values → pending_request | active | completed | cancelled | declined
 
     start_time: datetime = Field(default_factory=datetime.utcnow)
     end_time: Optional[datetime] = None
@@ -68,9 +85,15 @@ class Session(SQLModel, table=True):
 
     # Rating after session
     rating: Optional[int] = None
+    ratings: List["Rating"] = Relationship(back_populates="session")
 
 
 class Rating(SQLModel, table=True):
+    __table_args__ = (
+        # One rating per participant per session
+        UniqueConstraint("session_id", "rater_id", name="uq_rating_session_rater"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     rating: int = Field(ge=1, le=5)
     review: Optional[str] = None
@@ -91,9 +114,44 @@ class Rating(SQLModel, table=True):
     session: "Session" = Relationship(back_populates="ratings")
 
 
+class UserStats(SQLModel, table=True):
+    """Per-user aggregates maintained incrementally (see user_stats.py)."""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    rating_count: int = Field(default=0)
+    rating_sum: int = Field(default=0)
+    rating_mean: float = Field(default=0.0)
+    rating_bayes: float = Field(default=0.0, index=True)  # ranking score, prior-smoothed
+    sessions_completed: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CreditLedger(SQLModel, table=True):
+    """Append-only record of every credit_points change (see credits.py)."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    delta: int                                   # negative = debit
+    balance_after: Optional[int] = None
+    reason: str                                  # book | award | refund
+    session_id: Optional[int] = Field(default=None, foreign_key="session.id")
+    # One entry per (session, transition) — a retried/duplicate call is a no-op
+    idempotency_key: str = Field(unique=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        # Serves history pages: one conversation, ordered by (created_at, id)
+        Index("ix_message_conversation_created", "conversation_key", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     sender_id: int = Field(foreign_key="user.id")
     receiver_id: int = Field(foreign_key="user.id")
-    text: str = Field(index=True)
+    conversation_key: str  # "<min user id>:<max user id>" — see conversation_key_for()
+    text: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @staticmethod
+    def conversation_key_for(user_a: int, user_b: int) -> str:
+        low, high = sorted((user_a, user_b))
+        return f"{low}:{high}"
@@ -0,0 +1,132 @@
+# backend/notifications.py
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from config import settings
+from database import engine
+from metrics import metrics
+from models import PENDING_STATUSES, Session as SessionModel
+from websocket_manager import notification_manager, user_room
+
+logger = logging.getLogger("notifications")
+
+
+class NotificationHub:
+    """
+    Pushes session lifecycle events to each user's notification socket and
+    keeps the per-teacher pending-request counter behind the bell.
+
+    Counters are loaded from the DB on first use and then moved by the events
+    themselves, so they are authoritative between reconciliations (a reload
+    after `reconcile_seconds`, which also heals drift from writes made by
+    other workers). Event hooks are called from sync routes in the threadpool;
+    delivery is handed to the event loop bound at startup.
+    """
+
+    def __init__(self, reconcile_seconds: float):
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        # teacher_id → (loaded_at, pending count)
+        self._counts: Dict[int, Tuple[float, int]] = {}
+        # teacher_id → bumped on every adjustment, so a reload that raced
+        # with an event never overwrites the newer in-memory value
+        self._versions: Dict[int, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    # ───────────────────────────────────────────────
+    # Pending counter
+    # ───────────────────────────────────────────────
+    def pending(self, teacher_id: int) -> int:
+        """Current count; blocking DB reload on first use or when stale."""
+        with self._lock:
+            entry = self._counts.get(teacher_id)
+            if entry is not None and time.monotonic() - entry[0] < self.reconcile_seconds:
+                return entry[1]
+            version = self._versions.get(teacher_id, 0)
+
+        metrics.inc("notifications.reconcile")
+        count = self._load(teacher_id)
+        with self._lock:
+            if self._versions.get(teacher_id, 0) == version:
+                self._counts[teacher_id] = (time.monotonic(), count)
+            else:
+                count = self._counts.get(teacher_id, (0, count))[1]
+        return count
+
+    def adjust(self, teacher_id: int, delta: int) -> None:
+        with self._lock:
+            self._versions[teacher_id] = self._versions.get(teacher_id, 0) + 1
+            entry = self._counts.get(teacher_id)
+            if entry is not None:
+                self._counts[teacher_id] = (entry[0], max(0, entry[1] + delta))
+
+    def invalidate(self, teacher_id: int) -> None:
+        """Forget the counter; the next read reloads it."""
+        with self._lock:
+            self._versions[teacher_id] = self._versions.get(teacher_id, 0) + 1
+            self._counts.pop(teacher_id, None)
+
+    @staticmethod
+    def _load(teacher_id: int) -> int:
+        with Session(engine) as db:
+            return db.exec(
+                select(func.count()).select_from(SessionModel).where(
+                    SessionModel.teacher_id == teacher_id,
+                    SessionModel.status.in_(PENDING_STATUSES),
+                )
+            ).one()
+
+    # ───────────────────────────────────────────────
+    # Lifecycle events — call after the transition is committed
+    # ───────────────────────────────────────────────
+    def session_event(
+        self, kind: str, session: SessionModel, was_pending: Optional[bool] = False
+    ) -> None:
+        """
+        kind: requested | accepted | activated | declined | cancelled | ended.
+        was_pending=None means the previous status is unknown (recount).
+        """
+        if kind == "requested":
+            self.adjust(session.teacher_id, +1)
+        elif was_pending is None:
+            self.invalidate(session.teacher_id)
+        elif was_pending:
+            self.adjust(session.teacher_id, -1)
+
+        message = {
+            "type": f"session_{kind}",
+            "session_id": session.id,
+            "teacher_id": session.teacher_id,
+            "learner_id": session.learner_id,
+            "status": session.status,
+            "room_name": session.room_name,
+        }
+        self.publish(session.teacher_id, {**message, "pending_count": self.pending(session.teacher_id)})
+        self.publish(session.learner_id, message)
+        metrics.inc(f"notifications.session_{kind}")
+
+    def publish(self, user_id: int, message: dict) -> None:
+        """Thread-safe: deliver to every notification socket of one user."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, user_id, message)
+
+    def _deliver(self, user_id: int, message: dict) -> None:
+        task = asyncio.ensure_future(notification_manager.broadcast(user_room(user_id), message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# Singleton instance
+notification_hub = NotificationHub(reconcile_seconds=settings.NOTIFY_RECONCILE_SECONDS)
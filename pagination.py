@@ -0,0 +1,20 @@
+# backend/pagination.py
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+
+
+# ───────────────────────────────────────────────
+# Keyset cursors are "<timestamp iso>|<id>" — opaque to the client
+# ───────────────────────────────────────────────
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    return f"{ts.isoformat()}|{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        ts, _, row_id = cursor.rpartition("|")
+        return datetime.fromisoformat(ts), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,107 @@
+# backend/principal_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from config import settings
+from models import User
+
+
+def token_fingerprint(token: str) -> str:
+    """Short, stable fingerprint so raw JWTs are never kept in memory as keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+class PrincipalCache:
+    """
+    LRU + TTL cache of authenticated users, keyed by (user_id, token fingerprint).
+
+    Only plain column snapshots are stored. Every hit builds a fresh, detached
+    User so concurrent requests never share an ORM instance.
+
+    A hit proves identity (valid token, user exists); its other columns may be
+    up to `ttl_seconds` old, and invalidate() only reaches this process. Routes
+    that show or change the user's own profile (/api/auth/me) re-read the row
+    in their session instead of trusting or db.add()-ing the snapshot.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # (user_id, fingerprint) → (expires_at, column snapshot)
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, dict]]" = OrderedDict()
+        # user_id → fingerprints currently cached (for O(1) invalidation)
+        self._by_user: Dict[int, Set[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int, fingerprint: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        key = (user_id, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        return self._build(snapshot)
+
+    def put(self, fingerprint: str, user: User) -> None:
+        if not self.enabled or user.id is None:
+            return
+        key = (user.id, fingerprint)
+        snapshot = user.model_dump()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(user.id, set()).add(fingerprint)
+            while len(self._entries) > self.max_entries:
+                oldest, _ = next(iter(self._entries.items()))
+                self._remove(oldest)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            for fingerprint in self._by_user.pop(user_id, set()):
+                self._entries.pop((user_id, fingerprint), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, key: Tuple[int, str]) -> None:
+        self._entries.pop(key, None)
+        user_id, fingerprint = key
+        fingerprints = self._by_user.get(user_id)
+        if fingerprints is not None:
+            fingerprints.discard(fingerprint)
+            if not fingerprints:
+                del self._by_user[user_id]
+
+    @staticmethod
+    def _build(snapshot: dict) -> User:
+        data = {
+            k: list(v) if isinstance(v, list) else v
+            for k, v in snapshot.items()
+        }
+        user = User(**data)
+        make_transient_to_detached(user)
+        return user
+
+
+# Singleton instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
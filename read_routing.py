@@ -0,0 +1,174 @@
+# backend/read_routing.py
+"""
+Which reads may go to the read replica (DATABASE_REPLICA_URL).
+
+Read-heavy endpoints take get_read_session / get_async_read_session instead
+of the primary session. They read from the replica unless the caller wrote
+something in the last REPLICA_STICKY_SECONDS — that write may not have
+replicated yet — in which case they read the primary.
+
+Writes are noted by StickyWritesMiddleware (any successful non-GET request
+made with a bearer token) and by note_write() where one user's action
+changes what another user will read (session transitions, chat messages).
+Without a replica all of this is a no-op and every read uses the primary.
+
+The tracker is per process, so the middleware also hands the writer a
+short-lived cookie (STICKY_COOKIE, Max-Age REPLICA_STICKY_SECONDS). The
+writer's next reads stay on the primary whichever worker serves them. The
+note_write() marks for *other* users have no cookie and only reach the
+worker that made the write.
+"""
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import AsyncGenerator, Dict, Generator, Optional
+
+from fastapi import Depends, Response
+from sqlmodel import Session
+from starlette.requests import cookie_parser
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from auth import decode_user_id, get_current_user
+from config import settings
+from database import SAFE_METHODS, async_engine, async_replica_engine, engine, replica_engine
+from metrics import metrics
+from models import User
+
+REPLICA_ENABLED = replica_engine is not engine
+
+# Set on a successful write; its value is the writer's user id. A forged one
+# only moves the sender's own reads to the primary.
+STICKY_COOKIE = "skx_primary"
+_cookie_user: ContextVar[Optional[int]] = ContextVar("sticky_cookie_user", default=None)
+
+
+class WriteTracker:
+    """user_id → when they last wrote, pruned lazily once it grows."""
+
+    def __init__(self, sticky_seconds: float, prune_at: int = 10_000):
+        self.sticky_seconds = sticky_seconds
+        self.prune_at = prune_at
+        self._lock = threading.Lock()
+        self._last_write: Dict[int, float] = {}
+
+    def note(self, *user_ids: Optional[int]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for user_id in user_ids:
+                if user_id is not None:
+                    self._last_write[user_id] = now
+            if len(self._last_write) > self.prune_at:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {u: t for u, t in self._last_write.items() if t > cutoff}
+
+    def recent(self, user_id: int) -> bool:
+        wrote = self._last_write.get(user_id)
+        return wrote is not None and time.monotonic() - wrote < self.sticky_seconds
+
+
+write_tracker = WriteTracker(settings.REPLICA_STICKY_SECONDS)
+
+
+def note_write(*user_ids: Optional[int]) -> None:
+    """These users' next reads must see a write just committed on the primary."""
+    if REPLICA_ENABLED:
+        write_tracker.note(*user_ids)
+
+
+def note_own_write(response: Response, user_id: int) -> None:
+    """note_write() for the caller, when the middleware cannot tell who that is (no bearer token yet)."""
+    if REPLICA_ENABLED:
+        write_tracker.note(user_id)
+        response.headers.append("set-cookie", _sticky_cookie(user_id).decode("latin-1"))
+
+
+def use_replica(user_id: Optional[int]) -> bool:
+    if not REPLICA_ENABLED:
+        return False
+    if user_id is not None and (write_tracker.recent(user_id) or _cookie_user.get() == user_id):
+        metrics.inc("db.reads.primary_sticky")
+        return False
+    metrics.inc("db.reads.replica")
+    return True
+
+
+def read_engine(user_id: Optional[int]):
+    """Sync engine for reads outside a request-scoped session (e.g. streamed exports)."""
+    return replica_engine if use_replica(user_id) else engine
+
+
+# ───────────────────────────────────────────────
+# Dependencies
+# ───────────────────────────────────────────────
+def get_read_session(
+    current_user: User = Depends(get_current_user),
+) -> Generator[Session, None, None]:
+    with Session(read_engine(current_user.id)) as session:
+        yield session
+
+
+async def get_async_read_session(
+    current_user: User = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    bind = async_replica_engine if use_replica(current_user.id) else async_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+
+# ───────────────────────────────────────────────
+# Middleware — successful writes make the caller sticky
+# ───────────────────────────────────────────────
+def _bearer_user(headers) -> Optional[int]:
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return decode_user_id(token)
+    return None
+
+
+def _sticky_cookie_user(headers) -> Optional[int]:
+    for name, value in headers:
+        if name == b"cookie":
+            user_id = cookie_parser(value.decode("latin-1")).get(STICKY_COOKIE)
+            return int(user_id) if user_id and user_id.isdigit() else None
+    return None
+
+
+def _sticky_cookie(user_id: int) -> bytes:
+    max_age = max(1, math.ceil(settings.REPLICA_STICKY_SECONDS))
+    return f"{STICKY_COOKIE}={user_id}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode("latin-1")
+
+
+class StickyWritesMiddleware:
+    """Plain ASGI middleware; costs nothing without a replica, or on GETs without the cookie."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not REPLICA_ENABLED or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if scope["method"] in SAFE_METHODS:
+            user_id = _sticky_cookie_user(scope["headers"])
+            if user_id is None:
+                return await self.app(scope, receive, send)
+            token = _cookie_user.set(user_id)   # copied into threadpool routes/dependencies
+            try:
+                return await self.app(scope, receive, send)
+            finally:
+                _cookie_user.reset(token)
+
+        async def send_and_note(message):
+            # Routes commit before they respond, so the write is on the primary by now
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = _bearer_user(scope["headers"])
+                if user_id is not None:
+                    note_write(user_id)
+                    headers = list(message.get("headers", [])) + [(b"set-cookie", _sticky_cookie(user_id))]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_and_note)
@@ -0,0 +1,102 @@
+# backend/room_admission.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlmodel import Session, select
+
+from config import settings
+from database import engine
+from models import Session as SessionModel
+
+# room_name → (teacher_id, learner_id); None marks a known-unknown room
+Participants = Optional[Tuple[int, int]]
+
+ADMITTED = "admitted"
+UNKNOWN_ROOM = "unknown_room"
+NOT_PARTICIPANT = "not_participant"
+
+
+class RoomAdmission:
+    """
+    In-memory index of which users may join which signaling room.
+
+    Filled when a session is accepted and emptied when it ends, so a join is a
+    dict lookup. A miss (e.g. after a restart, or a room accepted on another
+    worker) costs one DB query, after which the answer is cached; rooms that
+    turn out not to exist are remembered for `negative_ttl` seconds so
+    scanning random room ids does not turn into a query per attempt.
+
+    revoke() only reaches this process, so admitted rooms are also re-checked
+    against the DB every `ttl` seconds: a session ended on another worker
+    stops admitting joins here within that window.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        # room_name → (expires_at, participants)
+        self._rooms: "OrderedDict[str, Tuple[float, Participants]]" = OrderedDict()
+
+    def allow(self, room_name: str, teacher_id: int, learner_id: int) -> None:
+        self._store(room_name, time.monotonic() + self.ttl, (teacher_id, learner_id))
+
+    def revoke(self, room_name: Optional[str]) -> None:
+        if not room_name:
+            return
+        with self._lock:
+            self._rooms.pop(room_name, None)
+
+    def lookup(self, room_name: str) -> Tuple[bool, Participants]:
+        """(hit, participants) — hit is False when the DB must be consulted."""
+        with self._lock:
+            entry = self._rooms.get(room_name)
+            if entry is None:
+                return False, None
+            expires_at, participants = entry
+            if expires_at < time.monotonic():
+                del self._rooms[room_name]
+                return False, None
+            self._rooms.move_to_end(room_name)
+            return True, participants
+
+    def load(self, room_name: str) -> Participants:
+        """Blocking DB fallback for a miss; run it off the event loop."""
+        with Session(engine) as db:
+            row = db.exec(
+                select(SessionModel.teacher_id, SessionModel.learner_id).where(
+                    SessionModel.room_name == room_name,
+                    SessionModel.status == "active",
+                )
+            ).first()
+        if row is None:
+            self._store(room_name, time.monotonic() + self.negative_ttl, None)
+            return None
+        self.allow(room_name, row[0], row[1])
+        return row[0], row[1]
+
+    @staticmethod
+    def check(participants: Participants, user_id: int) -> str:
+        if participants is None:
+            return UNKNOWN_ROOM
+        if user_id not in participants:
+            return NOT_PARTICIPANT
+        return ADMITTED
+
+    def _store(self, room_name: str, expires_at: float, participants: Participants) -> None:
+        with self._lock:
+            self._rooms[room_name] = (expires_at, participants)
+            self._rooms.move_to_end(room_name)
+            while len(self._rooms) > self.max_entries:
+                self._rooms.popitem(last=False)
+
+
+# Singleton instance
+room_admission = RoomAdmission(
+    max_entries=settings.ROOM_ADMISSION_MAX_ENTRIES,
+    ttl=settings.ROOM_ADMISSION_TTL_SECONDS,
+    negative_ttl=settings.ROOM_ADMISSION_NEGATIVE_TTL_SECONDS,
+)
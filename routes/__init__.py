@@ -7,6 +7,7 @@ from .ratings import router as ratings_router
 from .signaling import router as signaling_router
 from .teachers import router as teachers_router
 from .chat import chat_router          # ← THIS LINE WAS MISSING
+from .notifications import router as notifications_router
 
 __all__ = [
     "auth_router",
@@ -17,4 +18,5 @@ __all__ = [
     "signaling_router",
     "teachers_router",
     "chat_router",                     # ← THIS MUST BE HERE
+    "notifications_router",
 ]
\ No newline at end of file
@@ -1,9 +1,10 @@
 # backend/routes/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, or_
 from typing import Annotated
 
-from database import get_session
+from database import get_read_only_session, get_session, violated_unique
 from schemas import (
     UserCreate,
     UserLogin,
@@ -11,12 +12,17 @@ from schemas import (
     UserOut,
     ProfileUpdate,
 )
+import user_stats
+from matchmaking import matchmaker
 from models import User
+from read_routing import note_own_write
+from skill_index import skill_index
 from auth import (
     hash_password,
     verify_password,
     create_access_token,
     get_current_user,
+    invalidate_principal,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -25,17 +31,42 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 # ───────────────────────────────────────────────
 # SIGNUP
 # ───────────────────────────────────────────────
-@router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def signup(payload: UserCreate, db: Session = Depends(get_session)):
-    if db.exec(select(User).where(User.email == payload.email)).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
+# Unique constraint (Postgres name / SQLite columns) → field it protects
+USER_UNIQUE = {
+    "ix_user_email": "email",
+    "user.email": "email",
+    "ix_user_username": "username",
+    "user.username": "username",
+}
+
 
-    if payload.username and db.exec(select(User).where(User.username == payload.username)).first():
-        raise HTTPException(status_code=400, detail="Username already taken")
+def _already_taken(field: str) -> HTTPException:
+    if field == "username":
+        return HTTPException(status_code=400, detail="Username already taken")
+    return HTTPException(status_code=400, detail="Email already registered")
 
+
+@router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+def signup(
+    payload: UserCreate,
+    response: Response,
+    reader: Session = Depends(get_read_only_session),
+    db: Session = Depends(get_session),
+):
     if len(payload.password) > 72:
         raise HTTPException(status_code=400, detail="Password too long (max 72 characters)")
 
+    # Cheap indexed check first, so a duplicate never costs an argon2 hash. It
+    # runs outside the writing session: that one only begins (BEGIN IMMEDIATE,
+    # SQLite writer lane) at the INSERT, after the hash.
+    taken = User.email == payload.email
+    if payload.username:
+        taken = or_(taken, User.username == payload.username)
+    existing = reader.exec(select(User.email).where(taken).limit(1)).first()
+    reader.close()
+    if existing is not None:
+        raise _already_taken("email" if existing == payload.email else "username")
+
     user = User(
         email=payload.email,
         username=payload.username or None,
@@ -47,21 +78,35 @@ def signup(payload: UserCreate, db: Session = Depends(get_session)):
         teaching_skills=[],
     )
     db.add(user)
+    try:
+        db.flush()
+    except IntegrityError as e:
+        # Lost a race with a concurrent signup for the same email/username
+        field = USER_UNIQUE.get(violated_unique(e))
+        if field is None:
+            raise
+        db.rollback()
+        raise _already_taken(field)
+    user_id = user.id
     db.commit()
-    db.refresh(user)
+    invalidate_principal(user_id)
+    note_own_write(response, user_id)  # no bearer token on this request for the middleware to see
 
-    return TokenResponse(access_token=create_access_token(user.id))
+    return TokenResponse(access_token=create_access_token(user_id))
 
 
 # ───────────────────────────────────────────────
 # LOGIN
 # ───────────────────────────────────────────────
 @router.post("/login", response_model=TokenResponse)
-def login(payload: UserLogin, db: Session = Depends(get_session)):
-    user = (
-        db.exec(select(User).where(User.email == payload.identifier)).first()
-        or db.exec(select(User).where(User.username == payload.identifier)).first()
-    )
+def login(payload: UserLogin, db: Session = Depends(get_read_only_session)):   # reads only; argon2 runs inside
+    # One indexed lookup for "email or username"; an email match wins
+    rows = db.exec(
+        select(User.id, User.email, User.password_hash)
+        .where(or_(User.email == payload.identifier, User.username == payload.identifier))
+        .limit(2)
+    ).all()
+    user = next((r for r in rows if r.email == payload.identifier), rows[0] if rows else None)
 
     if not user or not verify_password(payload.password, user.password_hash):
         raise HTTPException(
@@ -70,6 +115,7 @@ def login(payload: UserLogin, db: Session = Depends(get_session)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    invalidate_principal(user.id)
     return TokenResponse(access_token=create_access_token(user.id))
 
 
@@ -77,7 +123,16 @@ def login(payload: UserLogin, db: Session = Depends(get_session)):
 # GET CURRENT USER — CORRECT FOR YOUR DB
 # ───────────────────────────────────────────────
 @router.get("/me")
-def get_me(current_user: Annotated[User, Depends(get_current_user)]):
+def get_me(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_session),
+):
+    # The cached principal only proves who is asking; credits, role and skills
+    # may have been changed by another worker, so read the row itself
+    current_user = db.get(User, current_user.id)
+    if current_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    stats = user_stats.get(db, current_user.id)  # precomputed — one primary-key read
     profile_pic_url = None
     if getattr(current_user, "avatar", None):  # Your actual column name is "avatar"
         filename = current_user.avatar.split("/")[-1] if "/" in current_user.avatar else current_user.avatar
@@ -93,8 +148,9 @@ def get_me(current_user: Annotated[User, Depends(get_current_user)]):
         "teaching_skills": current_user.teaching_skills or [],
         "profilePic": profile_pic_url,        # This is what your frontend expects
         "creditPoints": getattr(current_user, "credit_points", 0),
-        "rating": getattr(current_user, "rating", 4.8),
-        "sessionsCompleted": getattr(current_user, "sessionsCompleted", 0),
+        "rating": round(stats.rating_mean, 2),           # 0 until the first rating
+        "ratingCount": stats.rating_count,
+        "sessionsCompleted": stats.sessions_completed,
     }
 
 
@@ -107,6 +163,11 @@ def update_profile(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session),
 ):
+    # Branch on and write the current row, never the cached principal snapshot
+    current_user = db.get(User, current_user.id)
+    if current_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Onboarding flow (first time completing profile)
     if current_user.role == "pending":
         if not updates.role:
@@ -119,6 +180,13 @@ def update_profile(
         current_user.role = updates.role
         current_user.learning_interests = updates.learning_interests
         current_user.teaching_skills = updates.teaching_skills
+    else:
+        # Later edits: skill lists change only when the client sends them
+        sent = updates.model_fields_set
+        if "teaching_skills" in sent:
+            current_user.teaching_skills = updates.teaching_skills
+        if "learning_interests" in sent:
+            current_user.learning_interests = updates.learning_interests
 
     # Regular updates
     if updates.name:
@@ -129,6 +197,12 @@ def update_profile(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
+    invalidate_principal(current_user.id)
+    stats = user_stats.get(db, current_user.id)
+    skill_index.set_teacher(current_user.id, current_user.teaching_skills, current_user.role, stats.rating_bayes)
+    matchmaker.set_user(
+        current_user.id, current_user.role, current_user.teaching_skills, current_user.learning_interests
+    )
 
     # Return consistent format with correct profile pic URL
     profile_pic_url = None
@@ -146,6 +220,7 @@ def update_profile(
         "teaching_skills": current_user.teaching_skills or [],
         "profilePic": profile_pic_url,        # Frontend expects "profilePic"
         "creditPoints": getattr(current_user, "credit_points", 0),
-        "rating": getattr(current_user, "rating", 4.8),
-        "sessionsCompleted": getattr(current_user, "sessionsCompleted", 0),
+        "rating": round(stats.rating_mean, 2),           # 0 until the first rating
+        "ratingCount": stats.rating_count,
+        "sessionsCompleted": stats.sessions_completed,
     }
\ No newline at end of file
@@ -1,34 +1,193 @@
 # backend/routes/chat.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy import tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models import Message, User
-from auth import get_current_user
-from database import get_session
+from auth import decode_user_id, get_current_user
+from config import settings
+from database import async_engine
+from message_batcher import QueueFull, message_batcher
+from pagination import decode_cursor, encode_cursor
+from read_routing import get_async_read_session
+from websocket_manager import chat_manager, user_room
+
+logger = logging.getLogger("chat")
+
+# In-flight "ack when persisted" tasks (see _spawn_ack)
+_ack_tasks: Set[asyncio.Task] = set()
 
 # This name MUST be exactly "chat_router"
 chat_router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+
+def message_out(m: Message) -> dict:
+    return {
+        "id": m.id,
+        "sender_id": m.sender_id,
+        "receiver_id": m.receiver_id,
+        "text": m.text,
+        "timestamp": m.created_at.isoformat(),
+        "cursor": encode_cursor(m.created_at, m.id),
+    }
+
+
 @chat_router.get("/{receiver_id}/history")
 async def get_chat_history(
     receiver_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_read_session),
+    before: Optional[str] = Query(None, description="Cursor — return older messages"),
+    after: Optional[str] = Query(None, description="Cursor — return newer messages"),
+    limit: int = Query(settings.CHAT_HISTORY_PAGE_SIZE, ge=1),
+):
+    """One page of a conversation, oldest first. Defaults to the latest page."""
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    limit = min(limit, settings.CHAT_HISTORY_PAGE_SIZE_MAX)
+
+    key = Message.conversation_key_for(current_user.id, receiver_id)
+    position = tuple_(Message.created_at, Message.id)
+    stmt = select(Message).where(Message.conversation_key == key)
+
+    if after:
+        stmt = stmt.where(position > decode_cursor(after)).order_by(
+            Message.created_at, Message.id
+        )
+    else:
+        if before:
+            stmt = stmt.where(position < decode_cursor(before))
+        stmt = stmt.order_by(Message.created_at.desc(), Message.id.desc())
+
+    messages = list((await db.exec(stmt.limit(limit))).all())
+    if not after:
+        messages.reverse()
+
+    return [message_out(m) for m in messages]
+
+
+# ───────────────────────────────────────────────
+# Real-time chat — one socket per browser tab, authenticated by ?token=
+#
+# client → {"receiver_id": 7, "text": "hi", "client_id": "tmp-1"}
+# receiver ← {"type": "message", ...}   (immediately)
+# sender   ← {"type": "ack", "client_id": "tmp-1", "id": 42, "cursor": "..."}
+#            (once the row is durable)
+# ───────────────────────────────────────────────
+async def _user_exists(user_id: int) -> bool:
+    async with AsyncSession(async_engine) as db:
+        return await db.get(User, user_id) is not None
+
+
+async def _ack_when_persisted(
+    websocket: WebSocket, client_id, created_at: datetime, future: asyncio.Future
 ):
-    stmt = select(Message).where(
-        ((Message.sender_id == current_user.id) & (Message.receiver_id == receiver_id)) |
-        ((Message.sender_id == receiver_id) & (Message.receiver_id == current_user.id))
-    ).order_by(Message.created_at)
-
-    messages = db.exec(stmt).all()
-
-    return [
-        {
-            "id": m.id,
-            "sender_id": m.sender_id,
-            "receiver_id": m.receiver_id,
-            "text": m.text,
-            "timestamp": m.created_at.isoformat(),
+    try:
+        msg_id = await future
+        ack = {
+            "type": "ack",
+            "client_id": client_id,
+            "id": msg_id,
+            "cursor": encode_cursor(created_at, msg_id),
         }
-        for m in messages
-    ]
\ No newline at end of file
+    except Exception:
+        ack = {"type": "error", "client_id": client_id, "detail": "Message could not be saved"}
+    try:
+        await chat_manager.send_personal(ack, websocket)
+    except Exception as e:   # sender went away before the batch landed
+        logger.debug(f"Chat ack not delivered: {e}")
+
+
+def _spawn_ack(*args) -> None:
+    # Keep a reference until done — the loop only holds tasks weakly
+    task = asyncio.create_task(_ack_when_persisted(*args))
+    _ack_tasks.add(task)
+    task.add_done_callback(_ack_tasks.discard)
+
+
+@chat_router.websocket("/ws")
+async def chat_ws(websocket: WebSocket, token: Optional[str] = Query(None)):
+    user_id = decode_user_id(token) if token else None
+    if user_id is None:
+        await websocket.accept()   # a close before accept is a bare HTTP 403; clients need the 4401
+        await websocket.close(code=4401)
+        return
+
+    room = user_room(user_id)
+    await chat_manager.connect(room, websocket)
+    known_receivers: Set[int] = set()  # validated once per connection, not per message
+
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                await chat_manager.send_personal(
+                    {"type": "error", "client_id": None, "detail": "Expected a JSON object"},
+                    websocket,
+                )
+                continue
+            client_id = data.get("client_id")
+            receiver_id = data.get("receiver_id")
+            text = (data.get("text") or "").strip()
+
+            if not isinstance(receiver_id, int) or not text:
+                await chat_manager.send_personal(
+                    {"type": "error", "client_id": client_id, "detail": "receiver_id and text are required"},
+                    websocket,
+                )
+                continue
+            if receiver_id not in known_receivers:
+                if not await _user_exists(receiver_id):
+                    await chat_manager.send_personal(
+                        {"type": "error", "client_id": client_id, "detail": "Receiver not found"},
+                        websocket,
+                    )
+                    continue
+                known_receivers.add(receiver_id)
+
+            created_at = datetime.utcnow()
+            try:
+                future = message_batcher.submit({
+                    "sender_id": user_id,
+                    "receiver_id": receiver_id,
+                    "conversation_key": Message.conversation_key_for(user_id, receiver_id),
+                    "text": text,
+                    "created_at": created_at,
+                })
+            except QueueFull:
+                await chat_manager.send_personal(
+                    {"type": "error", "client_id": client_id, "detail": "Server busy, retry shortly"},
+                    websocket,
+                )
+                continue
+
+            outgoing = {
+                "type": "message",
+                "client_id": client_id,
+                "sender_id": user_id,
+                "receiver_id": receiver_id,
+                "text": text,
+                "timestamp": created_at.isoformat(),
+            }
+            # Deliver now; durability is confirmed to the sender separately
+            await chat_manager.broadcast(user_room(receiver_id), outgoing)
+            if receiver_id != user_id:
+                await chat_manager.broadcast(room, outgoing, sender=websocket)  # sender's other tabs
+            _spawn_ack(websocket, client_id, created_at, future)
+
+    except WebSocketDisconnect:
+        chat_manager.disconnect(room, websocket)
+
+    except Exception as e:
+        logger.error(f"Chat WebSocket error for user {user_id}: {e}")
+        chat_manager.disconnect(room, websocket)
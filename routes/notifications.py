@@ -0,0 +1,46 @@
+# backend/routes/notifications.py
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from auth import decode_user_id
+from notifications import notification_hub
+from websocket_manager import notification_manager, user_room
+
+router = APIRouter(prefix="/api/notifications", tags=["notifications"])
+logger = logging.getLogger("notifications")
+
+
+# ───────────────────────────────────────────────
+# Notification bell — replaces polling /api/sessions/pending-count
+#
+# server → {"type": "pending_count", "count": 3}          (on connect)
+# server → {"type": "session_requested" | "session_accepted" | "session_activated"
+#                   | "session_declined" | "session_cancelled" | "session_ended",
+#           "session_id": ..., "status": ..., "room_name": ...,
+#           "pending_count": 2}                              (teacher copy only)
+# ───────────────────────────────────────────────
+@router.websocket("/ws")
+async def notifications_ws(websocket: WebSocket, token: Optional[str] = Query(None)):
+    user_id = decode_user_id(token) if token else None
+    if user_id is None:
+        await websocket.accept()   # a close before accept is a bare HTTP 403; clients need the 4401
+        await websocket.close(code=4401)
+        return
+
+    room = user_room(user_id)
+    await notification_manager.connect(room, websocket)
+    count = await asyncio.to_thread(notification_hub.pending, user_id)
+    await notification_manager.send_personal({"type": "pending_count", "count": count}, websocket)
+
+    try:
+        while True:
+            await websocket.receive_text()  # server → client only; keeps the socket read
+    except WebSocketDisconnect:
+        notification_manager.disconnect(room, websocket)
+
+    except Exception as e:
+        logger.error(f"Notification WebSocket error for user {user_id}: {e}")
+        notification_manager.disconnect(room, websocket)
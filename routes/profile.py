@@ -1,13 +1,21 @@
 # backend/routes/sessions.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import case, or_, tuple_
 from sqlmodel import Session, select
-from typing import Annotated
+from typing import Annotated, List, Optional
 from datetime import datetime
 
+import credits
+import session_state
+from config import settings
+from credits import InsufficientCredits, session_key
 from database import get_session
-from auth import get_current_user
-from models import Session as SModel, User
-from schemas import SessionCreate, SessionOut
+from auth import get_current_user, invalidate_principal
+from notifications import notification_hub
+from pagination import decode_cursor, encode_cursor
+from read_routing import get_read_session
+from models import PENDING_STATUSES, STATUS_PENDING, Session as SModel, User
+from schemas import SessionCreate, SessionListItem, SessionOut
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
@@ -26,45 +34,79 @@ def create_session(
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
-    # Check credits
-    if current_user.credit_points < 5:
-        raise HTTPException(status_code=400, detail="Not enough credits (requires 5)")
-
-    # Deduct credits immediately
-    current_user.credit_points -= 5
-    db.add(current_user)
-
     session = SModel(
         teacher_id=payload.teacher_id,
         learner_id=current_user.id,
         topic=payload.topic or "Skill Exchange Session",
-        status="pending",  # user joins → becomes active
+        status=STATUS_PENDING,  # teacher accepts → becomes active
         start_time=datetime.utcnow(),
     )
-
     db.add(session)
+    db.flush()
+
+    # Deduct credits immediately — conditional UPDATE, so parallel bookings cannot overdraw
+    cost = settings.SESSION_COST_CREDITS
+    try:
+        credits.apply(db, current_user.id, -cost, "book", session_key(session.id, "book"), session.id)
+    except InsufficientCredits:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Not enough credits (requires {cost})")
+
     db.commit()
     db.refresh(session)
+    invalidate_principal(current_user.id)
+    notification_hub.session_event("requested", session)
 
     return session
 
 
-@router.get("/history", response_model=list[SessionOut])
+@router.get("/history", response_model=list[SessionListItem])
 def get_history(
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session),
+    response: Response,
+    db: Session = Depends(get_read_session),
+    before: Optional[str] = Query(None, description="Cursor — return older sessions"),
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
+    limit: int = Query(settings.SESSIONS_PAGE_SIZE, ge=1),
 ):
-    """Get all past + active sessions for current user."""
-    sessions = db.exec(
-        select(SModel)
-        .where((SModel.teacher_id == current_user.id) | (SModel.learner_id == current_user.id))
-        .order_by(SModel.start_time.desc())
-    ).all()
-    return sessions
-
-
-@router.get("/{session_id}", response_model=SessionOut)
-def get_session(
+    """Past + active sessions for current user, newest first, with the other participant.
+
+    One joined query per page; the next page's cursor is sent in the
+    X-Next-Cursor header (absent on the last page).
+    """
+    limit = min(limit, settings.SESSIONS_PAGE_SIZE_MAX)
+    me = current_user.id
+    counterpart_id = case((SModel.teacher_id == me, SModel.learner_id), else_=SModel.teacher_id)
+
+    stmt = (
+        select(SModel, User.id, User.name, User.avatar)
+        .join(User, User.id == counterpart_id)
+        .where(or_(SModel.teacher_id == me, SModel.learner_id == me))
+    )
+    if status_filter:
+        wanted = set(status_filter)
+        if wanted & set(PENDING_STATUSES):
+            wanted.update(PENDING_STATUSES)
+        stmt = stmt.where(SModel.status.in_(wanted))
+    if before:
+        stmt = stmt.where(tuple_(SModel.start_time, SModel.id) < decode_cursor(before))
+    stmt = stmt.order_by(SModel.start_time.desc(), SModel.id.desc()).limit(limit)
+
+    items = [
+        {
+            **s.model_dump(),
+            "counterpart": {"id": user_id, "name": name, "profile_pic": avatar},
+            "cursor": encode_cursor(s.start_time, s.id),
+        }
+        for s, user_id, name, avatar in db.exec(stmt).all()
+    ]
+    if len(items) == limit:
+        response.headers["X-Next-Cursor"] = items[-1]["cursor"]
+    return items
+
+
+@router.get("/{session_id:int}", response_model=SessionOut)
+def get_session_detail(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session),
@@ -79,88 +121,31 @@ def get_session(
     return session
 
 
-@router.put("/{session_id}/activate", response_model=SessionOut)
+@router.put("/{session_id:int}/activate", response_model=SessionOut)
 def activate_session(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session),
 ):
     """Mark session as active when WebRTC starts."""
-    session = db.get(SModel, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    return session_state.run(db, session_id, "activate", current_user.id)
 
-    if session.status != "pending":
-        raise HTTPException(status_code=400, detail="Session is already active or ended")
 
-    session.status = "active"
-    
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
-    return session
-
-
-@router.put("/{session_id}/end", response_model=SessionOut)
+@router.put("/{session_id:int}/end", response_model=SessionOut)
 def end_session(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session),
 ):
-    """End a session — award credits to teacher, enable rating."""
-    session = db.get(SModel, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    """End a session — award credits to teacher (once), enable rating."""
+    return session_state.run(db, session_id, "end", current_user.id)
 
-    if session.status not in ["active", "pending"]:
-        raise HTTPException(status_code=400, detail="Session already ended")
 
-    if session.teacher_id != current_user.id and session.learner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    session.status = "completed"
-    session.end_time = datetime.utcnow()
-
-    teacher = db.get(User, session.teacher_id)
-
-    # Award teacher 10 credits
-    if teacher:
-        teacher.credit_points = (teacher.credit_points or 0) + 10
-        db.add(teacher)
-
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    return session
-
-
-@router.put("/{session_id}/cancel", response_model=SessionOut)
+@router.put("/{session_id:int}/cancel", response_model=SessionOut)
 def cancel_session(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session),
 ):
     """Cancel session - refund learner, no penalty."""
-    session = db.get(SModel, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    if session.learner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Only the learner can cancel the session")
-
-    if session.status not in ["pending"]:
-        raise HTTPException(status_code=400, detail="Cannot cancel after activation")
-
-    session.status = "cancelled"
-    session.end_time = datetime.utcnow()
-
-    # Refund credits
-    current_user.credit_points += 5
-
-    db.add(current_user)
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
-    return session
+    return session_state.run(db, session_id, "cancel", current_user.id)
@@ -1,63 +1,94 @@
 # backend/routes/ratings.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from typing import Annotated
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from typing import Annotated, Optional
 
-from database import get_session
+import user_stats
+from database import get_session, violated_unique
 from auth import get_current_user
-from models import Rating, Session as SModel, User
+from matchmaking import matchmaker
+from models import STATUS_COMPLETED, Rating, Session as SModel, User
 from schemas import RatingCreate, RatingOut
+from skill_index import skill_index
 
 router = APIRouter(prefix="/api/ratings", tags=["ratings"])
 
+# uq_rating_session_rater as each dialect reports it (see database.violated_unique)
+RATING_UNIQUE = frozenset({"uq_rating_session_rater", "rating.session_id, rating.rater_id"})
+
+
+def rating_out(rating: Rating) -> dict:
+    """Rating row → RatingOut field names."""
+    return {
+        "id": rating.id,
+        "session_id": rating.session_id,
+        "reviewer_id": rating.rater_id,
+        "reviewee_id": rating.ratee_id,
+        "score": rating.rating,
+        "comment": rating.review,
+        "created_at": rating.created_at,
+    }
 
-@router.post("/", response_model=RatingOut, status_code=status.HTTP_201_CREATED)
-def submit_rating(
-    payload: RatingCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session),
-):
-    """Submit rating after a session is completed."""
 
-    # 1. Validate session
-    session = db.get(SModel, payload.session_id)
+def create_rating(
+    db: Session, session_id: int, rater_id: int, score: int, review: Optional[str] = None
+) -> Rating:
+    """Insert a rating and fold it into the ratee's aggregates in one transaction."""
+
+    # 1. Validate score
+    if score < 1 or score > 5:
+        raise HTTPException(status_code=400, detail="Score must be between 1 and 5")
+
+    # 2. Validate session
+    session = db.get(SModel, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # 2. Session must be completed
-    if session.status != "completed":
+    # 3. Session must be completed
+    if session.status != STATUS_COMPLETED:
         raise HTTPException(status_code=400, detail="Can only rate completed sessions")
 
-    # 3. Must be part of session
-    if current_user.id not in (session.teacher_id, session.learner_id):
+    # 4. Must be part of session
+    if rater_id not in (session.teacher_id, session.learner_id):
         raise HTTPException(status_code=403, detail="You were not part of this session")
 
-    # 4. Prevent duplicate rating
-    existing = db.exec(
-        select(Rating).where(Rating.session_id == payload.session_id)
-    ).first()
-
-    if existing:
-        raise HTTPException(status_code=400, detail="This session is already rated")
-
     # 5. Determine reviewee
-    reviewee_id = (
-        session.teacher_id
-        if current_user.id == session.learner_id
-        else session.learner_id
-    )
+    ratee_id = session.teacher_id if rater_id == session.learner_id else session.learner_id
 
-    # 6. Save rating
+    # 6. Save rating — uq_rating_session_rater rejects duplicates, even concurrent ones
     rating = Rating(
-        session_id=payload.session_id,
-        reviewer_id=current_user.id,
-        reviewee_id=reviewee_id,
-        score=payload.score,
-        comment=payload.comment,
+        session_id=session_id,
+        rater_id=rater_id,
+        ratee_id=ratee_id,
+        rating=score,
+        review=review,
     )
+    try:
+        db.add(rating)
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        if violated_unique(e) not in RATING_UNIQUE:
+            raise   # unknown session/user, NOT NULL … — a bug, not a duplicate
+        raise HTTPException(status_code=400, detail="You already rated this session")
 
-    db.add(rating)
+    # 7. Aggregates move with the insert (same commit)
+    user_stats.record_rating(db, ratee_id, score)
     db.commit()
     db.refresh(rating)
-
+    ranking = user_stats.get(db, ratee_id).rating_bayes
+    skill_index.set_score(ratee_id, ranking)
+    matchmaker.set_score(ratee_id, ranking)
     return rating
+
+
+@router.post("/", response_model=RatingOut, status_code=status.HTTP_201_CREATED)
+def submit_rating(
+    payload: RatingCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_session),
+):
+    """Submit rating after a session is completed."""
+    rating = create_rating(db, payload.session_id, current_user.id, payload.score, payload.comment)
+    return rating_out(rating)
@@ -1,31 +1,30 @@
 # backend/routes/sessions.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
-from typing import Annotated
-from datetime import datetime
+from typing import Annotated, Optional
 
+import session_state
+from config import settings
 from database import get_session
-from models import Session as SessionModel, User
+from models import PENDING_STATUSES, Session as SessionModel, User
 from auth import get_current_user
+from notifications import notification_hub
+from pagination import decode_cursor, encode_cursor
+from routes.ratings import create_rating, rating_out
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
 
 # ───────────────────────────────────────────────
 # Count pending session requests — for notification bell
+# (served from the in-memory counter; live updates: /api/notifications/ws)
 # ───────────────────────────────────────────────
 @router.get("/pending-count")
 def pending_count(
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session)
 ):
-    count = db.exec(
-        select(SessionModel).where(
-            SessionModel.teacher_id == current_user.id,
-            SessionModel.status == "pending_request"
-        )
-    ).count()
-    return {"count": count}
+    return {"count": notification_hub.pending(current_user.id)}
 
 
 # ───────────────────────────────────────────────
@@ -34,34 +33,41 @@ def pending_count(
 @router.get("/pending")
 def get_pending(
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Session = Depends(get_session)
+    response: Response,
+    db: Session = Depends(get_session),
+    after: Optional[str] = Query(None, description="Cursor — return later requests"),
+    limit: int = Query(settings.SESSIONS_PAGE_SIZE, ge=1),
 ):
-    sessions = db.exec(
-        select(SessionModel).where(
+    """Oldest request first, learner name & avatar joined in (one query per page)."""
+    limit = min(limit, settings.SESSIONS_PAGE_SIZE_MAX)
+    stmt = (
+        select(SessionModel, User.name, User.avatar)
+        .join(User, User.id == SessionModel.learner_id)
+        .where(
             SessionModel.teacher_id == current_user.id,
-            SessionModel.status == "pending_request"
+            SessionModel.status.in_(PENDING_STATUSES),
         )
-    ).all()
-
-    # Get learner names & avatars
-    learner_ids = {s.learner_id for s in sessions}
-    learners = db.exec(select(User).where(User.id.in_(learner_ids))).all()
-    learner_map = {u.id: u for u in learners}
+    )
+    if after:
+        stmt = stmt.where(tuple_(SessionModel.start_time, SessionModel.id) > decode_cursor(after))
+    stmt = stmt.order_by(SessionModel.start_time, SessionModel.id).limit(limit)
 
     result = []
-    for s in sessions:
-        learner = learner_map.get(s.learner_id)
+    for s, name, avatar in db.exec(stmt).all():
         result.append({
             "id": s.id,
             "room_name": s.room_name or f"skillxchange_{s.id}",
             "topic": s.topic,
             "start_time": s.start_time,
             "learner": {
-                "id": learner.id,
-                "name": learner.name,
-                "profilePic": learner.avatar if hasattr(learner, "avatar") else None,
-            }
+                "id": s.learner_id,
+                "name": name,
+                "profilePic": avatar,
+            },
+            "cursor": encode_cursor(s.start_time, s.id),
         })
+    if len(result) == limit:
+        response.headers["X-Next-Cursor"] = result[-1]["cursor"]
 
     return result
 
@@ -75,26 +81,12 @@ def accept_session(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session)
 ):
-    session = db.get(SessionModel, session_id)
-    if not session:
-        raise HTTPException(404, "Session not found")
-
-    if session.teacher_id != current_user.id:
-        raise HTTPException(403, "Not allowed")
-
-    session.status = "active"
-    if not session.room_name:
-        session.room_name = f"skillxchange_{session.id}"
-
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-
+    session = session_state.run(db, session_id, "accept", current_user.id)
     return {"room_name": session.room_name}
 
 
 # ───────────────────────────────────────────────
-# Decline a request
+# Decline a request (row is kept as "declined"; learner is refunded)
 # ───────────────────────────────────────────────
 @router.delete("/decline/{session_id}")
 def decline_session(
@@ -102,22 +94,14 @@ def decline_session(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session)
 ):
-    session = db.get(SessionModel, session_id)
-    if not session:
-        raise HTTPException(404, "Session not found")
-
-    if session.teacher_id != current_user.id:
-        raise HTTPException(403, "Not allowed")
-
-    db.delete(session)
-    db.commit()
+    session_state.run(db, session_id, "decline", current_user.id)
     return {"message": "Session declined"}
 
 
 # ───────────────────────────────────────────────
 # Get session by ID (used in VideoCall.jsx before websocket)
 # ───────────────────────────────────────────────
-@router.get("/{session_id}")
+@router.get("/{session_id:int}")
 def get_session_info(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
@@ -137,37 +121,24 @@ def get_session_info(
 # ───────────────────────────────────────────────
 # End call (triggered when clicking end button)
 # ───────────────────────────────────────────────
-@router.put("/{session_id}/end")
+@router.put("/{session_id:int}/end")
 def end_session(
     session_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session)
 ):
-    session = db.get(SessionModel, session_id)
-    if not session:
-        raise HTTPException(404, "Session not found")
-
-    session.status = "completed"
-    session.end_time = datetime.utcnow()
-    db.add(session)
-    db.commit()
-
+    session_state.run(db, session_id, "end", current_user.id)
     return {"message": "Session ended"}
 
 
 # ───────────────────────────────────────────────
 # Rating after call
 # ───────────────────────────────────────────────
-@router.post("/{session_id}/rating")
+@router.post("/{session_id:int}/rating")
 def rate_session(
     session_id: int,
     rating: int,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Session = Depends(get_session)
 ):
-    session = db.get(SessionModel, session_id)
-    if not session or session.status != "completed":
-        raise HTTPException(404, "Session not found or not completed yet")
-
-    if rating < 1 or rating > 5:
-        raise HTTPExceptio
+    return rating_out(create_rating(db, session_id, current_user.id, rating))
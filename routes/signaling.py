@@ -1,29 +1,113 @@
 # backend/routes/signaling.py
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from websocket_manager import manager
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from typing import Optional
+from auth import decode_user_id, get_current_user
+from config import settings
+from metrics import metrics
+from models import User
+from room_admission import ADMITTED, room_admission
+from websocket_manager import BINARY, JSON, Frame, manager, negotiate_codec
+import asyncio
 import logging
 
 router = APIRouter(prefix="/api/signaling", tags=["signaling"])
 logger = logging.getLogger("signaling")
 
 
+# Handshake close codes
+CLOSE_UNAUTHORIZED = 4401   # missing / invalid token
+CLOSE_FORBIDDEN = 4403      # unknown room, or not one of its participants
+CLOSE_ROOM_FULL = 4409      # SIGNALING_ROOM_CAPACITY reached
+
+
+async def _participants(room_id: str):
+    hit, participants = room_admission.lookup(room_id)
+    if not hit:
+        metrics.inc("signaling.admission_miss")
+        participants = await asyncio.to_thread(room_admission.load, room_id)
+    return participants
+
+
+async def _admission_code(room_id: str, token: Optional[str]) -> Optional[int]:
+    """None when the caller may join, else the close code to reject with."""
+    user_id = decode_user_id(token) if token else None
+    if user_id is None:
+        return CLOSE_UNAUTHORIZED
+
+    verdict = room_admission.check(await _participants(room_id), user_id)
+    if verdict != ADMITTED:
+        metrics.inc(f"signaling.rejected.{verdict}")
+        return CLOSE_FORBIDDEN
+    return None
+
+
 @router.websocket("/ws/{room_id}")
-async def signaling_ws(websocket: WebSocket, room_id: str):
+async def signaling_ws(
+    websocket: WebSocket,
+    room_id: str,
+    token: Optional[str] = Query(None),
+    ice_batch: bool = Query(False),   # client understands {"type": "ice-candidates"} frames
+):
     """WebRTC signaling server using simple broadcast."""
-    await manager.connect(room_id, websocket)
-    logger.info(f"WebSocket connected → room: {room_id}")
+    code = await _admission_code(room_id, token)
+    if code is not None:
+        # Accept first: a close before accept is sent as a bare HTTP 403 and the code is lost
+        await websocket.accept()
+        await websocket.close(code=code)
+        return
+
+    relay = settings.SIGNALING_FRAME_MODE == "relay"
+    subprotocol, codec = negotiate_codec(websocket) if relay else (None, JSON)
+    joined = await manager.connect(
+        room_id, websocket, codec=codec, subprotocol=subprotocol,
+        ice_batches=ice_batch, capacity=settings.SIGNALING_ROOM_CAPACITY,
+    )
+    if not joined:
+        metrics.inc("signaling.rejected.room_full")
+        await websocket.close(code=CLOSE_ROOM_FULL)
+        return
+    logger.debug(f"WebSocket connected → room: {room_id} ({codec})")
 
     try:
         while True:
-            data = await websocket.receive_json()
+            if not relay:
+                data = await websocket.receive_json()
+
+                # Broadcast to room EXCEPT sender
+                await manager.broadcast(room_id, data, sender=websocket)
+                continue
 
-            # Broadcast to room EXCEPT sender
-            await manager.broadcast(room_id, data, sender=websocket)
+            # Relay mode: forward the frame exactly as received — no decode, no re-encode
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                frame = Frame.raw(message["text"], JSON)
+            elif message.get("bytes") is not None:
+                frame = Frame.raw(message["bytes"], codec if codec != JSON else BINARY)
+            else:
+                continue
+            await manager.relay(room_id, frame, sender=websocket)
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected → room: {room_id}")
+        logger.debug(f"WebSocket disconnected → room: {room_id}")
         manager.disconnect(room_id, websocket)
 
     except Exception as e:
         logger.error(f"WebSocket error in room {room_id}: {e}")
         manager.disconnect(room_id, websocket)
+
+
+@router.get("/rooms/{room_id}/stats")
+async def room_stats(room_id: str, current_user: User = Depends(get_current_user)):
+    """Queue depth and slow-consumer counters (dropped / coalesced / evicted); participants only."""
+    # Same answer for "no such room" and "not yours", so room names cannot be probed
+    if room_admission.check(await _participants(room_id), current_user.id) != ADMITTED:
+        raise HTTPException(status_code=404, detail="Room not found")
+    members = await manager.room_size(room_id)
+    stats = manager.stats(room_id)
+    if stats is None:
+        if not members:
+            raise HTTPException(status_code=404, detail="Room not found")
+        stats = {"peers": 0}  # room only lives on other workers
+    return {**stats, "members": members}
@@ -1,16 +1,119 @@
 # backend/routes/teachers.py
+from typing import Annotated, List, Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Response
+from sqlmodel import Session, select
 
-router = APIRouter(prefix="/teachers", tags=["teachers"])
+from auth import get_current_user
+from config import settings
+from matchmaking import matchmaker
+from read_routing import get_read_session
+from models import User, UserStats
+from schemas import RecommendedTeacherOut, SkillSuggestion, TeacherOut
+from skill_index import normalize, skill_index
 
-# your routes here...
-@router.get("/")
-async def get_teachers():
-    ...
+router = APIRouter(prefix="/api/teachers", tags=["teachers"])
 
-@router.post("/")
-async def create_teacher():
-    ...
 
-# ... other routes
\ No newline at end of file
+def _teacher_rows(db: Session, ids: List[int]) -> List[dict]:
+    """One primary-key query for a page of teachers, returned in `ids` order."""
+    rows = db.exec(
+        select(User.id, User.name, User.avatar, User.teaching_skills, User.learning_interests, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id.in_(ids))
+    ).all()
+    by_id = {row[0]: row for row in rows}
+
+    teachers = []
+    for user_id in ids:
+        row = by_id.get(user_id)
+        if row is None:  # deleted since the index was built
+            continue
+        _, name, avatar, skills, interests, stats = row
+        teachers.append({
+            "id": user_id,
+            "name": name,
+            "profile_pic": avatar,
+            "teaching_skills": skills or [],
+            "learning_interests": interests or [],
+            "rating": round(stats.rating_mean, 2) if stats else 0.0,
+            "rating_count": stats.rating_count if stats else 0,
+            "score": round(stats.rating_bayes if stats else settings.RATING_PRIOR_MEAN, 3),
+            "sessions_completed": stats.sessions_completed if stats else 0,
+        })
+    return teachers
+
+
+def _terms(skill: List[str]) -> List[str]:
+    """?skill=python&skill=react and ?skill=python,react mean the same thing."""
+    return [t.strip() for value in skill for t in value.split(",") if t.strip()]
+
+
+@router.get("/", response_model=list[TeacherOut])
+def search_teachers(
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+    db: Session = Depends(get_read_session),
+    skill: List[str] = Query([], description="Skills to match (repeat or comma-separate)"),
+    mode: Literal["and", "or"] = Query("and", description="and = every skill, or = any skill"),
+    prefix: bool = Query(False, description="Treat each skill as a prefix (\"py\" → python, pytorch…)"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(settings.TEACHER_SEARCH_PAGE_SIZE, ge=1),
+):
+    """Teachers matching the skills, best Bayesian rating first.
+
+    Matching and ranking come from the in-memory skill index; only the page
+    itself is read from the DB (one primary-key query).
+    """
+    limit = min(limit, settings.TEACHER_SEARCH_PAGE_SIZE_MAX)
+    skill_index.ensure_loaded()
+    hits = skill_index.search(
+        _terms(skill), mode, prefix, limit=limit + 1, offset=offset, exclude=current_user.id
+    )
+    if len(hits) > limit:
+        hits = hits[:limit]
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    if not hits:
+        return []
+
+    return _teacher_rows(db, [user_id for user_id, _ in hits])
+
+
+@router.get("/recommended", response_model=list[RecommendedTeacherOut])
+def recommended_teachers(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Session = Depends(get_read_session),
+    limit: int = Query(settings.TEACHER_SEARCH_PAGE_SIZE, ge=1),
+):
+    """Teachers for the caller's learning interests, best match first.
+
+    Ranks skill overlap, the reverse overlap (they could learn from you),
+    rating and recency — see matchmaking.py. Lists are cached per learner
+    until some profile changes.
+    """
+    limit = min(limit, settings.MATCH_RESULTS)
+    matchmaker.ensure_loaded()
+    matches = matchmaker.recommend(current_user.id, limit)
+    if not matches:
+        return []
+
+    wants = {normalize(s) for s in current_user.learning_interests or ()}
+    gives = {normalize(s) for s in current_user.teaching_skills or ()}
+    teachers = _teacher_rows(db, [m.user_id for m in matches])
+    by_id = {m.user_id: m for m in matches}
+    for t in teachers:
+        t["match_score"] = round(by_id[t["id"]].score, 3)
+        t["matching_skills"] = [s for s in t["teaching_skills"] if normalize(s) in wants]
+        t["mutual_skills"] = [s for s in t["learning_interests"] if normalize(s) in gives]
+    return teachers
+
+
+@router.get("/skills", response_model=list[SkillSuggestion])
+def suggest_skills(
+    current_user: Annotated[User, Depends(get_current_user)],
+    prefix: str = Query("", description="Start of a skill name"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Skill autocomplete: most-taught skills starting with `prefix`."""
+    skill_index.ensure_loaded()
+    return [{"skill": s, "teachers": n} for s, n in skill_index.suggest(prefix, limit)]
@@ -1,24 +1,104 @@
 # backend/routes/users.py
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session, select
-from typing import Annotated
+from typing import Annotated, Optional
 
+from config import settings
 from database import get_session
 from models import User
 from schemas import UserOut
 from auth import get_current_user
+from read_routing import get_read_session, read_engine
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+# Public fields → columns. password_hash is never selectable.
+USER_FIELDS = {
+    "id": User.id,
+    "username": User.username,
+    "email": User.email,
+    "name": User.name,
+    "role": User.role,
+    "learning_interests": User.learning_interests,
+    "teaching_skills": User.teaching_skills,
+    "credit_points": User.credit_points,
+    "profile_pic": User.avatar,
+}
+
+
+def _parse_fields(fields: Optional[str]) -> list[str]:
+    """Validate ?fields=a,b,c against USER_FIELDS (id is always included for the cursor)."""
+    if not fields:
+        return list(USER_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in USER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def _page_stmt(names: list[str], after: Optional[int], limit: int):
+    stmt = select(*[USER_FIELDS[n].label(n) for n in names]).order_by(User.id).limit(limit)
+    if after is not None:
+        stmt = stmt.where(User.id > after)
+    return stmt
+
 
 @router.get("/", response_model=list[UserOut])
 def list_users(
     current_user: Annotated[User, Depends(get_current_user)],  # ← non-default first
-    db: Session = Depends(get_session),                        # ← default second
+    response: Response,
+    db: Session = Depends(get_read_session),                   # ← default second
+    cursor: Optional[int] = Query(None, description="Return users with id > cursor"),
+    limit: int = Query(settings.USERS_PAGE_SIZE, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields"),
 ):
-    """Get all users — protected route (login required)"""
-    users = db.exec(select(User)).all()
-    return users
+    """Get users one keyset page at a time — protected route (login required).
+
+    The next page's cursor is sent in the X-Next-Cursor header (absent on the last page).
+    """
+    names = _parse_fields(fields)
+    limit = min(limit, settings.USERS_PAGE_SIZE_MAX)
+
+    rows = db.exec(_page_stmt(names, cursor, limit)).all()
+    headers = {"X-Next-Cursor": str(rows[-1].id)} if len(rows) == limit else {}
+
+    if fields:
+        # Projection bypasses UserOut so partial rows are not rejected
+        return JSONResponse([dict(r._mapping) for r in rows], headers=headers)
+    response.headers.update(headers)
+    return [dict(r._mapping) for r in rows]
+
+
+@router.get("/export")
+def export_users(
+    current_user: Annotated[User, Depends(get_current_user)],
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields"),
+):
+    """Stream every user as one JSON array without holding the table in memory."""
+    names = _parse_fields(fields)
+    batch = settings.USERS_EXPORT_BATCH
+    bind = read_engine(current_user.id)
+
+    def generate():
+        yield "["
+        first = True
+        after = None
+        # Each batch gets its own short-lived session so no connection is held across yields
+        while True:
+            with Session(bind) as db:
+                rows = db.exec(_page_stmt(names, after, batch)).all()
+            for r in rows:
+                yield ("" if first else ",") + json.dumps(dict(r._mapping), default=str)
+                first = False
+            if len(rows) < batch:
+                break
+            after = rows[-1].id
+        yield "]"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @router.get("/{user_id}", response_model=UserOut)
@@ -29,4 +109,4 @@ def get_user_by_id(
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
\ No newline at end of file
+    return user
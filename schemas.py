@@ -70,6 +70,37 @@ class SessionOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class UserSummary(BaseModel):
+    id: int
+    name: Optional[str]
+    profile_pic: Optional[str] = None
+
+
+class TeacherOut(UserSummary):
+    teaching_skills: List[str] = []
+    rating: float = 0.0            # plain mean shown to users
+    rating_count: int = 0
+    score: float                   # Bayesian rating the results are ranked by
+    sessions_completed: int = 0
+
+
+class RecommendedTeacherOut(TeacherOut):
+    match_score: float
+    matching_skills: List[str] = []   # teacher's skills the learner wants
+    mutual_skills: List[str] = []     # learner's skills the teacher wants (exchange)
+
+
+class SkillSuggestion(BaseModel):
+    skill: str
+    teachers: int
+
+
+class SessionListItem(SessionOut):
+    room_name: Optional[str] = None
+    counterpart: UserSummary       # the other participant (teacher or learner)
+    cursor: str                    # pass as ?before= for the next page
+
+
 # ───────────────────────────────────────────────
 # RATING
 # ───────────────────────────────────────────────
@@ -0,0 +1,155 @@
+# backend/session_state.py
+"""
+Session lifecycle transitions.
+
+Every transition is a single conditional UPDATE
+(WHERE id = :id AND status IN (:expected) AND <caller may do this>) with
+RETURNING, so concurrent accept / decline / end calls cannot both win and the
+row is never read first. Credit movements and user aggregates are updated in
+the same transaction; lifecycle events (notifications, room admission,
+cached principals) fire after commit. Only a transition that matches nothing
+costs a second query, to explain why.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import String, cast, func, literal, or_, select, update
+from sqlmodel import Session
+
+import credits
+import user_stats
+from auth import invalidate_principal
+from config import settings
+from credits import session_key
+from models import (
+    PENDING_STATUSES,
+    STATUS_ACTIVE,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_DECLINED,
+    Session as SessionModel,
+)
+from notifications import notification_hub
+from read_routing import note_write
+from room_admission import room_admission
+
+# Who may run a transition
+TEACHER = "teacher"
+LEARNER = "learner"
+PARTICIPANT = "participant"
+
+
+@dataclass(frozen=True)
+class Transition:
+    event: str                      # lifecycle event kind sent to notification sockets
+    sources: Tuple[str, ...]        # statuses the UPDATE may match
+    target: str
+    actor: str
+    credit: Optional[str] = None    # "award" (teacher) | "refund" (learner)
+    opens_room: bool = False
+    closes_room: bool = False
+
+
+TRANSITIONS = {
+    "accept": Transition("accepted", PENDING_STATUSES, STATUS_ACTIVE, TEACHER, opens_room=True),
+    "activate": Transition("activated", PENDING_STATUSES, STATUS_ACTIVE, PARTICIPANT, opens_room=True),
+    "decline": Transition(
+        "declined", PENDING_STATUSES, STATUS_DECLINED, TEACHER, credit="refund", closes_room=True
+    ),
+    "cancel": Transition(
+        "cancelled", PENDING_STATUSES, STATUS_CANCELLED, LEARNER, credit="refund", closes_room=True
+    ),
+    "end": Transition(
+        "ended", PENDING_STATUSES + (STATUS_ACTIVE,), STATUS_COMPLETED, PARTICIPANT,
+        credit="award", closes_room=True,
+    ),
+}
+
+_FORBIDDEN = {
+    TEACHER: "Only the teacher can do this",
+    LEARNER: "Only the learner can do this",
+    PARTICIPANT: "Not authorized",
+}
+
+
+def _actor_clause(actor: str, user_id: int):
+    if actor == TEACHER:
+        return SessionModel.teacher_id == user_id
+    if actor == LEARNER:
+        return SessionModel.learner_id == user_id
+    return or_(SessionModel.teacher_id == user_id, SessionModel.learner_id == user_id)
+
+
+def run(db: Session, session_id: int, name: str, user_id: int) -> SessionModel:
+    """Apply transition `name` as `user_id`, commit, emit events; returns the updated row."""
+    t = TRANSITIONS[name]
+    values = {"status": t.target}
+    if t.target != STATUS_ACTIVE:
+        values["end_time"] = datetime.utcnow()
+    if t.opens_room:
+        values["room_name"] = func.coalesce(
+            SessionModel.room_name, literal("skillxchange_") + cast(SessionModel.id, String)
+        )
+
+    stmt = (
+        update(SessionModel)
+        .where(
+            SessionModel.id == session_id,
+            SessionModel.status.in_(t.sources),
+            _actor_clause(t.actor, user_id),
+        )
+        .values(**values)
+        .returning(SessionModel)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    session = db.execute(stmt).scalar_one_or_none()
+    if session is None:
+        db.rollback()
+        raise _explain(db, session_id, name, t, user_id)
+
+    credited = None
+    if t.credit == "award":
+        credited = session.teacher_id
+        amount = settings.SESSION_AWARD_CREDITS
+    elif t.credit == "refund":
+        credited = session.learner_id
+        amount = settings.SESSION_COST_CREDITS
+    if credited is not None:
+        credits.apply(db, credited, amount, t.credit, session_key(session.id, t.credit), session.id)
+    if t.target == STATUS_COMPLETED:
+        user_stats.record_completion(db, session.teacher_id, session.learner_id)
+
+    db.expunge(session)  # keep the RETURNING values; commit would expire them
+    db.commit()
+
+    # ── after commit ──
+    note_write(session.teacher_id, session.learner_id)
+    if credited is not None:
+        invalidate_principal(credited)
+    if t.opens_room:
+        room_admission.allow(session.room_name, session.teacher_id, session.learner_id)
+    if t.closes_room:
+        room_admission.revoke(session.room_name)
+    # Only "end" can start from more than one status, and RETURNING cannot say which
+    was_pending = True if set(t.sources) <= set(PENDING_STATUSES) else None
+    notification_hub.session_event(t.event, session, was_pending)
+    return session
+
+
+def _explain(db: Session, session_id: int, name: str, t: Transition, user_id: int) -> HTTPException:
+    row = db.execute(
+        select(SessionModel.teacher_id, SessionModel.learner_id, SessionModel.status)
+        .where(SessionModel.id == session_id)
+    ).first()
+    if row is None:
+        return HTTPException(status_code=404, detail="Session not found")
+    allowed = {
+        TEACHER: row.teacher_id == user_id,
+        LEARNER: row.learner_id == user_id,
+        PARTICIPANT: user_id in (row.teacher_id, row.learner_id),
+    }[t.actor]
+    if not allowed:
+        return HTTPException(status_code=403, detail=_FORBIDDEN[t.actor])
+    return HTTPException(status_code=400, detail=f"Cannot {name} a session that is {row.status}")
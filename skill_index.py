@@ -0,0 +1,299 @@
+# backend/skill_index.py
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from config import settings
+from database import engine
+from metrics import metrics
+from models import User, UserStats
+
+logger = logging.getLogger("skill_index")
+
+TEACHER_ROLES = ("teacher", "both")
+MODE_AND = "and"
+MODE_OR = "or"
+
+
+def normalize(skill: str) -> str:
+    """Case/whitespace-insensitive key: " Machine  Learning" → "machine learning"."""
+    return " ".join(skill.lower().split())
+
+
+class SkillIndex:
+    """
+    In-memory inverted index over teachers' teaching_skills.
+
+    skill → posting set of user ids, plus a sorted skill list for prefix
+    matching (bisect) and each teacher's ranking score (UserStats.rating_bayes).
+    Each posting also gets a score-ordered copy, so a search reads just
+    enough of it to fill one page.
+    Built from the DB on first use and kept current by set_teacher() /
+    set_score() calls from the routes that change them. A rebuild every
+    SKILL_INDEX_REFRESH_SECONDS (in a background thread, while the old index
+    keeps serving) picks up writes made by other workers.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._skills: List[str] = []                     # sorted keys of _postings
+        self._by_user: Dict[int, FrozenSet[str]] = {}
+        self._scores: Dict[int, float] = {}
+        self._ranked: Dict[Optional[str], List[Tuple[float, int]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._rebuilding = False
+
+    # ───────────────────────────────────────────────
+    # Loading
+    # ───────────────────────────────────────────────
+    def ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            with self._lock:
+                if self._loaded_at is None:
+                    self._swap(*self._build())
+        elif time.monotonic() - self._loaded_at > self.refresh_seconds and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._refresh, name="skill-index-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            self._swap(*self._build())
+        except Exception as e:
+            logger.error(f"Skill index rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+
+    @staticmethod
+    def _build():
+        started = time.perf_counter()
+        with Session(engine) as db:
+            rows = db.exec(
+                select(User.id, User.teaching_skills, UserStats.rating_bayes)
+                .outerjoin(UserStats, UserStats.user_id == User.id)
+                .where(User.role.in_(TEACHER_ROLES))
+            ).all()
+        postings: Dict[str, Set[int]] = {}
+        by_user: Dict[int, FrozenSet[str]] = {}
+        scores: Dict[int, float] = {}
+        for user_id, skills, score in rows:
+            keys = frozenset(normalize(s) for s in skills or () if s and s.strip())
+            if not keys:
+                continue
+            by_user[user_id] = keys
+            scores[user_id] = score if score is not None else settings.RATING_PRIOR_MEAN
+            for key in keys:
+                postings.setdefault(key, set()).add(user_id)
+        metrics.observe("skill_index.build_seconds", time.perf_counter() - started)
+        return postings, by_user, scores
+
+    def _swap(self, postings, by_user, scores) -> None:
+        with self._lock:
+            self._postings = postings
+            self._skills = sorted(postings)
+            self._by_user = by_user
+            self._scores = scores
+            self._ranked = {}
+            self._loaded_at = time.monotonic()
+
+    # ───────────────────────────────────────────────
+    # Ranked postings: (-score, user_id) ascending = best first.
+    # Built per skill on first query, then patched in place on updates.
+    # Key None ranks every teacher (queries without skills).
+    # ───────────────────────────────────────────────
+    def _ranked_list(self, key: Optional[str]) -> List[Tuple[float, int]]:
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            users = self._by_user if key is None else self._postings[key]
+            ranked = self._ranked[key] = sorted((-self._scores[u], u) for u in users)
+        return ranked
+
+    def _rank_add(self, key: Optional[str], entry: Tuple[float, int]) -> None:
+        ranked = self._ranked.get(key)
+        if ranked is not None:
+            bisect.insort(ranked, entry)
+
+    def _rank_remove(self, key: Optional[str], entry: Tuple[float, int]) -> None:
+        ranked = self._ranked.get(key)
+        if ranked is not None:
+            i = bisect.bisect_left(ranked, entry)
+            if i < len(ranked) and ranked[i] == entry:
+                ranked.pop(i)
+
+    # ───────────────────────────────────────────────
+    # Updates — cheap no-ops until the index is first loaded
+    # ───────────────────────────────────────────────
+    def set_teacher(
+        self, user_id: int, skills: Iterable[str], role: Optional[str], score: Optional[float] = None
+    ) -> None:
+        """
+        Re-index one user after their skills or role changed. `score`
+        (UserStats.rating_bayes) ranks a user who was not indexed yet; users
+        already in the index keep theirs, which set_score() maintains.
+        """
+        if self._loaded_at is None:
+            return
+        keys = frozenset(normalize(s) for s in skills or () if s and s.strip())
+        if role not in TEACHER_ROLES:
+            keys = frozenset()
+        with self._lock:
+            old = self._by_user.get(user_id, frozenset())
+            if old or score is None:
+                score = self._scores.get(user_id, settings.RATING_PRIOR_MEAN)
+            entry = (-score, user_id)
+            for key in old - keys:
+                posting = self._postings.get(key)
+                if posting is not None:
+                    posting.discard(user_id)
+                    self._rank_remove(key, entry)
+                    if not posting:
+                        del self._postings[key]
+                        self._ranked.pop(key, None)
+                        i = bisect.bisect_left(self._skills, key)
+                        if i < len(self._skills) and self._skills[i] == key:
+                            self._skills.pop(i)
+            for key in keys - old:
+                if key not in self._postings:
+                    self._postings[key] = set()
+                    bisect.insort(self._skills, key)
+                self._postings[key].add(user_id)
+                self._rank_add(key, entry)
+            if keys and not old:
+                self._by_user[user_id] = keys
+                self._scores[user_id] = -entry[0]
+                self._rank_add(None, entry)
+            elif keys:
+                self._by_user[user_id] = keys
+            elif old:
+                del self._by_user[user_id]
+                self._scores.pop(user_id, None)
+                self._rank_remove(None, entry)
+
+    def set_score(self, user_id: int, score: float) -> None:
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            keys = self._by_user.get(user_id)
+            if keys is None:
+                return
+            old, new = (-self._scores[user_id], user_id), (-score, user_id)
+            self._scores[user_id] = score
+            for key in (None, *keys):
+                self._rank_remove(key, old)
+                self._rank_add(key, new)
+
+    # ───────────────────────────────────────────────
+    # Queries
+    # ───────────────────────────────────────────────
+    def _prefix_keys(self, prefix: str) -> List[str]:
+        i = bisect.bisect_left(self._skills, prefix)
+        keys = []
+        while i < len(self._skills) and self._skills[i].startswith(prefix):
+            keys.append(self._skills[i])
+            i += 1
+        return keys
+
+    def _term_keys(self, term: str, prefix: bool) -> List[str]:
+        if prefix:
+            return self._prefix_keys(term)
+        return [term] if term in self._postings else []
+
+    def _stream(self, keys: List[str]) -> Iterator[Tuple[float, int]]:
+        """Users holding any of `keys`, best first (duplicates possible)."""
+        if len(keys) == 1:
+            return iter(self._ranked_list(keys[0]))
+        return heapq.merge(*(self._ranked_list(k) for k in keys))
+
+    def _sparse(self, pairs, want: int) -> bool:
+        """Expected AND matches (terms assumed independent) too few to stop a walk early."""
+        total = max(len(self._by_user), 1)
+        expected = float(total)
+        for _, keys in pairs:
+            expected *= sum(len(self._postings[k]) for k in keys) / total
+        return expected < want * 4
+
+    def _intersect(self, term_keys, want: int, exclude: Optional[int]) -> List[Tuple[int, float]]:
+        """Set intersection, then rank only the survivors."""
+        sets = [
+            self._postings[keys[0]] if len(keys) == 1 else set().union(*(self._postings[k] for k in keys))
+            for keys in term_keys
+        ]
+        candidates = set(sets[0]).intersection(*sets[1:])
+        candidates.discard(exclude)
+        scores = self._scores
+        return [(u, -s) for s, u in heapq.nsmallest(want, ((-scores[u], u) for u in candidates))]
+
+    def search(
+        self,
+        skills: List[str],
+        mode: str = MODE_AND,
+        prefix: bool = False,
+        limit: int = 20,
+        offset: int = 0,
+        exclude: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """(user_id, score) best first. AND = every skill, OR = any skill.
+
+        Walks score-ordered postings and stops once the page is full, so cost
+        follows offset + limit rather than the number of matches. AND queries
+        expected to match only a handful of teachers intersect the sets instead.
+        """
+        terms = [t for t in dict.fromkeys(normalize(s) for s in skills) if t]
+        want = offset + limit
+        hits: List[Tuple[int, float]] = []
+        seen: Set[int] = set()
+        with self._lock:
+            if not terms:
+                stream, accept = iter(self._ranked_list(None)), None
+            else:
+                term_keys = [self._term_keys(t, prefix) for t in terms]
+                if mode == MODE_OR:
+                    stream = self._stream([k for keys in term_keys for k in keys])
+                    accept = None
+                else:
+                    if not all(term_keys):
+                        return []
+                    # Walk the rarest term; check the rest against each user's skills
+                    pairs = sorted(
+                        zip(terms, term_keys),
+                        key=lambda tk: sum(len(self._postings[k]) for k in tk[1]),
+                    )
+                    rest = [t for t, _ in pairs[1:]]
+                    if rest and self._sparse(pairs, want):
+                        return self._intersect([keys for _, keys in pairs], want, exclude)[offset:]
+                    stream = self._stream(pairs[0][1])
+                    by_user = self._by_user
+                    if not rest:
+                        accept = None
+                    elif prefix:
+                        def accept(u):
+                            return all(any(k.startswith(t) for k in by_user[u]) for t in rest)
+                    else:
+                        def accept(u):
+                            return all(t in by_user[u] for t in rest)
+            for neg_score, user_id in stream:
+                if user_id == exclude or user_id in seen:
+                    continue
+                seen.add(user_id)
+                if accept is not None and not accept(user_id):
+                    continue
+                hits.append((user_id, -neg_score))
+                if len(hits) >= want:
+                    break
+        return hits[offset:]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Autocomplete: (skill, number of teachers) for skills starting with prefix."""
+        with self._lock:
+            keys = self._prefix_keys(normalize(prefix))
+            return heapq.nlargest(limit, ((k, len(self._postings[k])) for k in keys), key=lambda kv: kv[1])
+
+
+# Singleton instance
+skill_index = SkillIndex(refresh_seconds=settings.SKILL_INDEX_REFRESH_SECONDS)
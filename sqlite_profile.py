@@ -0,0 +1,122 @@
+# backend/sqlite_profile.py
+"""
+SQLite production profile (local runs and small single-box deployments).
+
+Every new connection gets WAL journaling, synchronous=NORMAL, a memory map,
+a bigger page cache and a busy timeout, so readers and the writer stop
+blocking each other.
+
+SQLite still allows only one writing transaction at a time. pysqlite's own
+transaction handling makes this worse: it opens a deferred transaction just
+before the first INSERT/UPDATE/DELETE. If that transaction has already read,
+its write fails with SQLITE_BUSY at once, because busy_timeout cannot help
+a stale snapshot. On sync engines, SQLAlchemy therefore emits BEGIN itself.
+Connections from an engine with the WRITE option (database.write_engine)
+start with BEGIN IMMEDIATE and take the write lock before their first read;
+every other connection gets a plain deferred BEGIN.
+
+The writer lane serializes those writing transactions inside the process,
+so they queue on a lock instead of spinning in busy_timeout. BEGIN
+IMMEDIATE waits for the lane, and returning the connection to the pool
+(which sessions do right after COMMIT/ROLLBACK) frees it. Reads never take
+the lane.
+
+This is installed on sync engines only. The async engine is used for reads,
+and a threading lock must never be awaited on the event loop.
+"""
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from config import settings
+from metrics import metrics
+
+# Execution option marking an engine whose transactions write (see database.write_engine)
+WRITE = {"sqlite_begin": "IMMEDIATE"}
+
+
+class WriterLaneBusy(RuntimeError):
+    """Waited SQLITE_BUSY_TIMEOUT_MS for the writer lane."""
+
+
+class WriterLane:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def acquire(self, info: dict) -> None:
+        if info.get("writer_lane"):
+            return
+        started = time.perf_counter()
+        if not self._lock.acquire(timeout=self.timeout):
+            metrics.inc("sqlite.writer_lane.timeouts")
+            raise WriterLaneBusy("SQLite writer lane busy")
+        info["writer_lane"] = True
+        metrics.observe("sqlite.writer_lane.wait_seconds", time.perf_counter() - started)
+
+    def release(self, info: dict) -> None:
+        if info.pop("writer_lane", False):
+            self._lock.release()
+
+
+def apply_pragmas(engine) -> None:
+    """Run the tuning PRAGMAs on every new DBAPI connection of `engine`."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}",   # negative = KiB
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if settings.SQLITE_WAL:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+
+    @event.listens_for(engine, "connect")
+    def _tune(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def install_transactions(engine, lane: Optional[WriterLane] = None) -> None:
+    """Explicit BEGIN / BEGIN IMMEDIATE on a sync `engine`; writing ones go through `lane`."""
+
+    @event.listens_for(engine, "connect")
+    def _driver_autocommit(dbapi_connection, _record):
+        dbapi_connection.isolation_level = None   # pysqlite stops emitting its own BEGIN
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        if conn.get_execution_options().get("sqlite_begin") != WRITE["sqlite_begin"]:
+            conn.exec_driver_sql("BEGIN")
+            return
+        if lane is not None:
+            lane.acquire(conn.info)   # conn.info is the pooled connection's record.info
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    if lane is None:
+        return
+
+    # Sessions hand the connection back to the pool once COMMIT/ROLLBACK has
+    # run (the Connection-level commit event fires before it), so the lane is
+    # freed here, as is a connection that is thrown away mid-transaction.
+    @event.listens_for(engine, "checkin")
+    def _checkin(_dbapi_connection, record):
+        lane.release(record.info)
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(_dbapi_connection, record, _exception):
+        lane.release(record.info)
+
+
+def configure(engine, lane: Optional[WriterLane] = None) -> None:
+    """Apply the profile to a SQLite engine (sync or async); transactions and lane for sync engines only."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    apply_pragmas(sync_engine)
+    if sync_engine is engine:
+        install_transactions(engine, lane)
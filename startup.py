@@ -0,0 +1,131 @@
+# backend/startup.py
+"""
+Cold start in two steps.
+
+The eager part (FastAPI, CORS, /health) is all uvicorn waits for before it
+accepts connections. Routers, the database, the auth stack and the
+in-memory indexes load afterwards on a worker thread (main._warm).
+Meanwhile ReadinessGate holds every other request until that finishes.
+
+StartupReport records where the time goes. Each phase is printed once the
+app is ready and kept as a startup.<phase>_seconds gauge in /metrics.
+main.py imports this first, so "imports" covers the eager part (not the
+interpreter or uvicorn itself).
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from config import settings
+from metrics import metrics
+
+# Answered while warming up (and when warm-up failed)
+OPEN_PATHS = frozenset({"/health", "/metrics"})
+
+
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._mark = self.started
+        self.phases: Dict[str, float] = {}
+
+    def _record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        metrics.set_gauge(f"startup.{name}_seconds", self.phases[name])
+
+    def mark(self, name: str) -> None:
+        """Charge the time since the previous mark (or import) to `name`."""
+        now = time.perf_counter()
+        self._record(name, now - self._mark)
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+
+    def summary(self) -> str:
+        total = time.perf_counter() - self.started
+        metrics.set_gauge("startup.total_seconds", total)
+        parts = [f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items()]
+        return " · ".join(parts + [f"total {total * 1000:.0f} ms"])
+
+
+class Readiness:
+    """Whether the deferred part of startup has finished, and how."""
+
+    def __init__(self):
+        self._done: Optional[asyncio.Event] = None
+        self.error: Optional[BaseException] = None
+
+    def begin(self) -> None:
+        """Called from the startup event, so the Event belongs to the serving loop."""
+        self._done = asyncio.Event()
+        self.error = None
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done is not None and self._done.is_set() and self.error is None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    async def wait(self, timeout: float) -> bool:
+        if self._done is None:
+            return False
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.error is None
+
+
+class ReadinessGate:
+    """
+    Plain ASGI middleware, just inside CORS. OPEN_PATHS pass straight through;
+    anything else waits for readiness (503 / close 1013 after
+    STARTUP_GATE_TIMEOUT_SECONDS or when warm-up failed). Once ready,
+    requests go through `wrap(app)` — middleware whose imports are part of
+    the deferred load.
+    """
+
+    def __init__(self, app, wrap: Callable = lambda app: app):
+        self.app = app
+        self.wrap = wrap
+        self._inner = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan" or scope["path"] in OPEN_PATHS:
+            return await self.app(scope, receive, send)
+        if self._inner is None:
+            if not readiness.ready and not await readiness.wait(settings.STARTUP_GATE_TIMEOUT_SECONDS):
+                metrics.inc("startup.gate_rejected")
+                return await _unavailable(scope, send)
+            self._inner = self.wrap(self.app)
+        await self._inner(scope, receive, send)
+
+
+async def _unavailable(scope, send) -> None:
+    if scope["type"] == "websocket":
+        await send({"type": "websocket.close", "code": 1013})   # try again later
+        return
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")],
+    })
+    await send({"type": "http.response.body", "body": b'{"detail":"Starting up, please retry shortly"}'})
+
+
+# Singleton instances
+startup_report = StartupReport()
+readiness = Readiness()
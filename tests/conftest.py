@@ -0,0 +1,16 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+
+# A throwaway SQLite file before anything imports database.py (.env may name Postgres)
+_tmp = tempfile.mkdtemp(prefix="skx-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
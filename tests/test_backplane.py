@@ -0,0 +1,74 @@
+# backend/tests/test_backplane.py
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backplane import Backplane, RedisBackplane  # noqa: E402
+
+pytestmark = pytest.mark.anyio
+
+
+def _worker(server, member_ttl: float = 60.0) -> RedisBackplane:
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return RedisBackplane("test", member_ttl=member_ttl, client=client)
+
+
+async def _until(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_backplane_is_abstract():
+    with pytest.raises(TypeError):
+        Backplane()
+
+
+async def test_publish_reaches_other_workers_only():
+    server = fakeredis.FakeServer()
+    a, b = _worker(server), _worker(server)
+    got = {"a": [], "b": []}
+
+    def on(name):
+        async def handler(room_id, origin, data):
+            got[name].append((room_id, origin, data))
+        return handler
+
+    await a.start("A", on("a"))
+    await b.start("B", on("b"))
+    await asyncio.sleep(0.05)   # let both subscriptions settle
+
+    await a.publish("room:1", "A", "j{\"type\":\"offer\"}")
+    await _until(lambda: got["b"])
+    assert got["b"] == [("room:1", "A", "j{\"type\":\"offer\"}")]
+    assert got["a"] == []       # a worker never hears its own publish
+
+    await a.close()
+    await b.close()
+
+
+async def test_membership_is_shared_across_workers():
+    server = fakeredis.FakeServer()
+    a, b = _worker(server), _worker(server)
+
+    assert await a.join("room:1", "m1") == 1
+    assert await b.join("room:1", "m2") == 2
+    assert await a.members("room:1") == 2
+    assert await b.leave("room:1", "m2") == 1
+
+    await b.join("room:1", "m3")
+    await b.close()             # a worker shutting down takes its members with it
+    assert await a.members("room:1") == 1
+    await a.close()
+
+
+async def test_members_of_a_dead_worker_age_out():
+    server = fakeredis.FakeServer()
+    a = _worker(server, member_ttl=60.0)
+    await a.join("room:1", "m1")
+    # No heartbeat since long ago — as if its worker crashed
+    await a.redis.zadd(a._members_key("room:1"), {"m1": 0})
+    assert await a.members("room:1") == 0
@@ -0,0 +1,68 @@
+# backend/tests/test_credits.py
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+import credits
+from database import engine, init_db
+from models import CreditLedger, User
+
+
+@pytest.fixture
+def user_id():
+    init_db()
+    with Session(engine) as db:
+        user = User(email=f"{uuid.uuid4().hex}@example.com", name="c", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def _balance_and_entries(user_id: int, key: str):
+    with Session(engine) as db:
+        balance = db.get(User, user_id).credit_points
+        entries = db.exec(
+            select(func.count()).select_from(CreditLedger).where(CreditLedger.idempotency_key == key)
+        ).one()
+    return balance, entries
+
+
+def test_replayed_key_applies_once(user_id):
+    with Session(engine) as db:
+        assert credits.apply(db, user_id, 5, "award", "test:replay") == 25
+        assert credits.apply(db, user_id, 5, "award", "test:replay") is None
+        db.commit()
+    assert _balance_and_entries(user_id, "test:replay") == (25, 1)
+
+
+def test_concurrent_applies_move_the_balance_once(user_id):
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def apply_once():
+        with Session(engine) as db:
+            barrier.wait()
+            results.append(credits.apply(db, user_id, -3, "book", "test:race"))
+            db.commit()
+
+    threads = [threading.Thread(target=apply_once) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results, key=lambda r: r is None) == [17] + [None] * (workers - 1)
+    assert _balance_and_entries(user_id, "test:race") == (17, 1)
+
+
+def test_other_integrity_errors_are_not_swallowed(user_id):
+    with Session(engine) as db:
+        with pytest.raises(IntegrityError):
+            credits.apply(db, user_id, 5, None, "test:not-null")
+        db.rollback()
+    assert _balance_and_entries(user_id, "test:not-null") == (20, 0)
@@ -0,0 +1,26 @@
+# backend/tests/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+
+
+@pytest.fixture
+def no_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+
+def test_loopback_only_without_a_token(no_token):
+    assert TestClient(main.app, client=("127.0.0.1", 50000)).get("/metrics").status_code == 200
+    assert TestClient(main.app, client=("203.0.113.7", 50000)).get("/metrics").status_code == 404
+    # Starlette's default TestClient host is not loopback
+    assert TestClient(main.app).get("/metrics").status_code == 404
+
+
+def test_token_required_when_set(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    client = TestClient(main.app, client=("127.0.0.1", 50000))
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
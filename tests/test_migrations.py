@@ -0,0 +1,51 @@
+# backend/tests/test_migrations.py
+import os
+import tempfile
+import threading
+
+from sqlalchemy import func, select
+from sqlmodel import create_engine
+
+import migrations
+import sqlite_profile
+
+
+def _fresh_engine():
+    path = os.path.join(tempfile.mkdtemp(prefix="skx-test-"), "migrate.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    sqlite_profile.configure(engine)   # as database.py does; no lane, so threads act like processes
+    return engine
+
+
+def test_concurrent_upgrades_apply_each_step_once():
+    engine = _fresh_engine()
+    workers = 6
+    barrier = threading.Barrier(workers)
+    results, errors = [], []
+
+    def upgrade():
+        barrier.wait()
+        try:
+            results.append(migrations.upgrade(engine))
+        except Exception as e:   # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=upgrade) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert results == [migrations.SCHEMA_VERSION] * workers
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(migrations.schema_version)).scalar() == 1
+        assert migrations.current_version(conn) == migrations.SCHEMA_VERSION
+    engine.dispose()
+
+
+def test_upgrade_is_a_no_op_when_current():
+    engine = _fresh_engine()
+    assert migrations.upgrade(engine) == migrations.SCHEMA_VERSION
+    assert migrations.upgrade(engine) == migrations.SCHEMA_VERSION
+    engine.dispose()
@@ -0,0 +1,66 @@
+# backend/user_stats.py
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from config import settings
+from models import UserStats
+
+
+def empty(user_id: int) -> UserStats:
+    """Aggregates of a user nobody has rated yet (ranks at the prior)."""
+    return UserStats(user_id=user_id, rating_bayes=settings.RATING_PRIOR_MEAN)
+
+
+def get(db: Session, user_id: int) -> UserStats:
+    """Primary-key read; never scans Rating."""
+    return db.get(UserStats, user_id) or empty(user_id)
+
+
+def record_rating(db: Session, user_id: int, score: int) -> None:
+    """Fold one rating into the ratee's aggregates, in the caller's transaction."""
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    prior_mass = prior_weight * settings.RATING_PRIOR_MEAN
+    # Right-hand sides see the pre-update values, so this is one atomic statement
+    _bump(db, [user_id], {
+        UserStats.rating_count: UserStats.rating_count + 1,
+        UserStats.rating_sum: UserStats.rating_sum + score,
+        UserStats.rating_mean: (UserStats.rating_sum + score) * 1.0 / (UserStats.rating_count + 1),
+        UserStats.rating_bayes: (UserStats.rating_sum + score + prior_mass)
+        / (UserStats.rating_count + 1 + prior_weight),
+    })
+
+
+def record_completion(db: Session, teacher_id: int, learner_id: int) -> None:
+    """Count a completed session for both participants, in the caller's transaction."""
+    _bump(db, [teacher_id, learner_id], {
+        UserStats.sessions_completed: UserStats.sessions_completed + 1,
+    })
+
+
+def _bump(db: Session, user_ids: Iterable[int], values: dict) -> None:
+    values = {**values, UserStats.updated_at: datetime.utcnow()}
+    for user_id in user_ids:
+        stmt = (
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(stmt).rowcount:
+            continue
+        # First aggregate for this user — create the row, then apply the same UPDATE.
+        # A concurrent creator wins the insert; the UPDATE then lands on its row.
+        savepoint = db.begin_nested()
+        row = empty(user_id)
+        try:
+            db.add(row)
+            db.flush()
+            savepoint.commit()
+            db.expunge(row)  # the UPDATE below bypasses the identity map
+        except IntegrityError:
+            savepoint.rollback()
+        db.execute(stmt)
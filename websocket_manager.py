@@ -1,68 +1,494 @@
 # backend/websocket_manager.py
-from typing import Dict, List, Set
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
+import base64
+import json
 import logging
+import time
+import uuid
+
+try:
+    import msgpack
+except ImportError:  # in requirements.txt; without it the msgpack subprotocol is not offered
+    msgpack = None
+
+from backplane import Backplane, InMemoryBackplane, create_backplane
+from config import settings
+from metrics import metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("websocket")
 
+# asyncio.timeout (3.11+) avoids the extra task wait_for creates per send
+_deadline = getattr(asyncio, "timeout", None)
+
+# Per-connection / per-frame events are counted in metrics; repeated warnings
+# are sampled so a flapping room cannot flood the log.
+_last_logged: Dict[str, float] = {}
+_suppressed: Dict[str, int] = {}
+
+
+def log_sampled(level: int, key: str, message: str):
+    now = time.monotonic()
+    if now - _last_logged.get(key, -1e9) < settings.WS_LOG_SAMPLE_SECONDS:
+        _suppressed[key] = _suppressed.get(key, 0) + 1
+        return
+    skipped = _suppressed.pop(key, 0)
+    _last_logged[key] = now
+    logger.log(level, f"{message} (+{skipped} similar suppressed)" if skipped else message)
+
+
+# Slow-consumer policies (what happens when a peer's send queue is full)
+DROP_OLDEST = "drop_oldest"
+COALESCE_ICE = "coalesce_ice"
+DISCONNECT = "disconnect"
+
+ICE_CANDIDATE_TYPES = {"candidate", "ice-candidate", "ice_candidate", "ice"}
+ICE_BATCH_TYPE = "ice-candidates"
+
+
+# ───────────────────────────────────────────────
+# Frame codecs
+#
+# json     — text frames (default, what browsers send today)
+# msgpack  — binary frames, negotiated via Sec-WebSocket-Protocol
+# binary   — opaque bytes from a json client; relayed untouched
+# ───────────────────────────────────────────────
+JSON = "json"
+MSGPACK = "msgpack"
+BINARY = "binary"
+
+SUBPROTOCOLS = {"skillx.json": JSON, "skillx.msgpack": MSGPACK}
+
+_UNDECODED = object()
+_UNDECODABLE = object()
+
+
+def encode_frame(message: dict) -> str:
+    """Serialize once, exactly as WebSocket.send_json would."""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_payload(message, codec: str):
+    if codec == MSGPACK:
+        return msgpack.packb(message, use_bin_type=True)
+    return encode_frame(message)
+
+
+def negotiate_codec(websocket: WebSocket) -> Tuple[Optional[str], str]:
+    """Pick the first subprotocol the client offered that we support → (subprotocol, codec)."""
+    for offered in websocket.scope.get("subprotocols") or []:
+        codec = SUBPROTOCOLS.get(offered)
+        if codec == MSGPACK and msgpack is None:
+            continue
+        if codec:
+            return offered, codec
+    return None, JSON
+
+
+def is_ice_candidate(message: dict) -> bool:
+    return message.get("type") in ICE_CANDIDATE_TYPES
+
+
+class Frame:
+    """
+    One outbound frame shared by every recipient queue.
+
+    Raw frames are relayed exactly as received. They are only decoded when
+    something needs to look inside (transcoding for a peer on another codec,
+    or merging ICE candidates under pressure), and each encoding is produced
+    at most once per frame regardless of how many peers receive it.
+    """
+
+    __slots__ = ("codec", "_payloads", "_decoded")
+
+    def __init__(self, payload=None, codec: str = JSON, message=_UNDECODED):
+        self.codec = codec
+        self._payloads = {codec: payload} if payload is not None else {}
+        self._decoded = message
+
+    @classmethod
+    def raw(cls, payload, codec: str = JSON) -> "Frame":
+        return cls(payload, codec)
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Frame":
+        return cls(None, JSON, message)
+
+    @classmethod
+    def ice_batch(cls, candidates: List[dict]) -> "Frame":
+        return cls.from_message({"type": ICE_BATCH_TYPE, "candidates": candidates})
+
+    def _decode(self):
+        if self._decoded is _UNDECODED:
+            try:
+                payload = self._payloads[self.codec]
+                if self.codec == JSON:
+                    self._decoded = json.loads(payload)
+                elif self.codec == MSGPACK:
+                    self._decoded = msgpack.unpackb(payload, raw=False)
+                else:
+                    self._decoded = _UNDECODABLE
+            except Exception:
+                self._decoded = _UNDECODABLE
+        return self._decoded
+
+    @property
+    def is_candidate(self) -> bool:
+        """
+        Cheap pre-check first: offers/answers never contain `candidate"`
+        (SDP lines are `a=candidate:`), so they are never parsed here.
+        """
+        if self._decoded is _UNDECODED:
+            payload = self._payloads.get(self.codec)
+            if isinstance(payload, str) and 'candidate"' not in payload:
+                return False
+            if isinstance(payload, bytes) and b"candidate" not in payload:
+                return False
+        return self.candidates is not None
+
+    @property
+    def candidates(self) -> Optional[List[dict]]:
+        """ICE candidates carried by this frame, or None if it is anything else."""
+        message = self._decode()
+        if not isinstance(message, dict):
+            return None
+        if is_ice_candidate(message):
+            return [message]
+        if message.get("type") == ICE_BATCH_TYPE:
+            return list(message.get("candidates") or [])
+        return None
+
+    def payload_for(self, codec: str):
+        payload = self._payloads.get(codec)
+        if payload is None:
+            if self.codec == BINARY:
+                return self._payloads[BINARY]
+            message = self._decode()
+            if message is _UNDECODABLE:
+                raise ValueError(f"{self.codec} frame cannot be transcoded to {codec}")
+            payload = self._payloads[codec] = encode_payload(message, codec)
+        return payload
+
+    # Backplane transport is text: tag + payload (binary payloads base64-encoded)
+    def to_wire(self) -> str:
+        if self.codec == JSON:
+            return "j" + self.payload_for(JSON)
+        tag = "m" if self.codec == MSGPACK else "b"
+        return tag + base64.b64encode(self._payloads[self.codec]).decode("ascii")
+
+    @classmethod
+    def from_wire(cls, data: str) -> "Frame":
+        tag, body = data[:1], data[1:]
+        if tag == "j":
+            return cls.raw(body, JSON)
+        return cls.raw(base64.b64decode(body), MSGPACK if tag == "m" else BINARY)
+
+
+class Peer:
+    """A connected socket with its own bounded outbound queue and writer task."""
+
+    def __init__(self, room_id: str, websocket: WebSocket, codec: str = JSON, ice_batches: bool = False):
+        self.room_id = room_id
+        self.websocket = websocket
+        self.codec = codec
+        # Client opted in to {"type": "ice-candidates"} frames; others only ever get single candidates
+        self.ice_batches = ice_batches
+        self.queue: Deque[Frame] = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.member_id = uuid.uuid4().hex
+
+
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        queue_max: int = settings.WS_SEND_QUEUE_MAX,
+        policy: str = settings.WS_SLOW_CONSUMER_POLICY,
+        backplane: Optional[Backplane] = None,
+        ice_window_ms: int = 0,
+    ):
         # room_id → set of websockets
         self.rooms: Dict[str, Set[WebSocket]] = {}
+        self.peers: Dict[WebSocket, Peer] = {}
+        # room_id → {"dropped", "coalesced", "evicted"}
+        self.room_counters: Dict[str, Dict[str, int]] = {}
+        self.send_timeout = send_timeout
+        self.queue_max = max(1, queue_max)
+        self.policy = policy
+        # > 0 → trickled ICE candidates are batched within this window, for peers that opted in
+        self.ice_window = ice_window_ms / 1000
+        # Shares rooms with other workers; in-memory means this process only
+        self.backplane = backplane or InMemoryBackplane()
+        self.instance_id = uuid.uuid4().hex
+        self._background: Set[asyncio.Task] = set()
+        self._join_lock = asyncio.Lock()
 
-    async def connect(self, room_id: str, websocket: WebSocket):
-        await websocket.accept()
-        if room_id not in self.rooms:
-            self.rooms[room_id] = set()
-        self.rooms[room_id].add(websocket)
-        logger.info(f"Client connected to room {room_id}. Total: {len(self.rooms[room_id])}")
+    async def start(self):
+        await self.backplane.start(self.instance_id, self._on_remote)
+
+    async def stop(self):
+        await self.backplane.close()
+
+    async def _on_remote(self, room_id: str, origin: str, data: str):
+        """A broadcast published by another worker — deliver to our local sockets."""
+        self._deliver(room_id, Frame.from_wire(data), sender=None)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def connect(
+        self,
+        room_id: str,
+        websocket: WebSocket,
+        codec: str = JSON,
+        subprotocol: Optional[str] = None,
+        ice_batches: bool = False,
+        capacity: Optional[int] = None,
+    ) -> bool:
+        """
+        Accept the socket and add it to the room. With `capacity`, False means
+        the room was already full: the socket is accepted but not added, and
+        the caller closes it with its own code.
+        """
+        await websocket.accept(subprotocol=subprotocol)
+        peer = Peer(room_id, websocket, codec, ice_batches)
+        # Count + insert as one step: the lock orders joins on this worker, and
+        # joining the backplane before checking catches a race with another worker
+        async with self._join_lock:
+            total = await self.backplane.join(room_id, peer.member_id)
+            if capacity is not None and total > capacity:
+                await self.backplane.leave(room_id, peer.member_id)
+                metrics.inc("ws.room_full")
+                return False
+            if room_id not in self.rooms:
+                self.rooms[room_id] = set()
+                self.room_counters[room_id] = {"dropped": 0, "coalesced": 0, "evicted": 0}
+            self.rooms[room_id].add(websocket)
+            peer.writer = asyncio.create_task(self._writer(peer))
+            self.peers[websocket] = peer
+        metrics.inc("ws.connected")
+        logger.debug(f"Client connected to room {room_id}. Total: {total}")
+        return True
 
     def disconnect(self, room_id: str, websocket: WebSocket):
+        peer = self.peers.pop(websocket, None)
+        if peer is not None:
+            peer.closed = True
+            peer.ready.set()  # wake the writer so it exits
+            self._spawn(self.backplane.leave(room_id, peer.member_id))
         if room_id not in self.rooms:
             return
         self.rooms[room_id].discard(websocket)
-        logger.info(f"Client disconnected from room {room_id}. Remaining: {len(self.rooms[room_id])}")
+        metrics.inc("ws.disconnected")
+        logger.debug(f"Client disconnected from room {room_id}. Remaining: {len(self.rooms[room_id])}")
         if not self.rooms[room_id]:
             del self.rooms[room_id]
-            logger.info(f"Room {room_id} is now empty and removed.")
+            self.room_counters.pop(room_id, None)
+            logger.debug(f"Room {room_id} is now empty and removed.")
 
     async def send_personal(self, message: dict, websocket: WebSocket):
+        peer = self.peers.get(websocket)
+        if peer is not None:
+            self._enqueue(peer, Frame.from_message(message))
+            return
         try:
             await websocket.send_json(message)
         except WebSocketDisconnect:
             pass
         except Exception as e:
-            logger.error(f"Error sending to client: {e}")
+            log_sampled(logging.ERROR, "send_personal", f"Error sending to client: {e}")
 
     async def broadcast(self, room_id: str, message: dict, sender: WebSocket | None = None):
-        if room_id not in self.rooms:
-            return
-        disconnected = []
-        for ws in self.rooms[room_id]:
-            if sender and ws == sender:
-                continue  # don't echo back to sender if needed
-            try:
-                await ws.send_json(message)
-            except WebSocketDisconnect:
-                disconnected.append(ws)
-            except Exception as e:
-                logger.error(f"Broadcast error: {e}")
-                disconnected.append(ws)
-        # Clean up disconnected
-        for ws in disconnected:
-            self.rooms[room_id].discard(ws)
-        if not self.rooms[room_id]:
-            del self.rooms[room_id]
+        await self.relay(room_id, Frame.from_message(message), sender)
+
+    async def relay(self, room_id: str, frame: Frame, sender: WebSocket | None = None):
+        """Forward a frame to the room (every worker) without touching its payload."""
+        metrics.inc("ws.frames_in")
+        self._deliver(room_id, frame, sender)
+        if self.backplane.distributed:
+            await self.backplane.publish(room_id, self.instance_id, frame.to_wire())
+
+    def _deliver(self, room_id: str, frame: Frame, sender: WebSocket | None):
+        # Enqueue only — each peer's writer does the actual send, so a backed-up
+        # receiver never applies backpressure to the sender's receive loop.
+        for ws in list(self.rooms.get(room_id, ())):
+            peer = self.peers.get(ws)
+            if ws is not sender and peer is not None:
+                self._enqueue(peer, frame)
+
+    def codec_of(self, websocket: WebSocket) -> str:
+        peer = self.peers.get(websocket)
+        return peer.codec if peer is not None else JSON
+
+    async def room_size(self, room_id: str) -> int:
+        """Connections in the room across every worker."""
+        return await self.backplane.members(room_id)
 
     async def send_to_room_except(self, room_id: str, message: dict, exclude: WebSocket):
+        await self.broadcast(room_id, message, sender=exclude)
+
+    def stats(self, room_id: str) -> Optional[dict]:
         if room_id not in self.rooms:
+            return None
+        depths = [len(self.peers[ws].queue) for ws in self.rooms[room_id] if ws in self.peers]
+        return {
+            "peers": len(self.rooms[room_id]),
+            "queued": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            **self.room_counters.get(room_id, {}),
+        }
+
+    # ───────────────────────────────────────────────
+    # Queueing + slow-consumer policy
+    # ───────────────────────────────────────────────
+    def _count(self, room_id: str, key: str, n: int = 1):
+        counters = self.room_counters.get(room_id)
+        if counters is not None:
+            counters[key] += n
+        metrics.inc(f"ws.{key}", n)
+
+    def _enqueue(self, peer: Peer, frame: Frame):
+        if peer.closed:
             return
-        for ws in self.rooms[room_id]:
-            if ws == exclude:
-                continue
-            await self.send_personal(message, ws)
+        if len(peer.queue) >= self.queue_max:
+            if self.policy == DISCONNECT:
+                log_sampled(logging.WARNING, "slow_consumer", f"Slow consumer in room {peer.room_id} — disconnecting")
+                self._evict(peer)
+                return
+            if not (self.policy == COALESCE_ICE and peer.ice_batches and self._coalesce(peer)):
+                peer.queue.popleft()
+                self._count(peer.room_id, "dropped")
+        peer.queue.append(frame)
+        peer.ready.set()
+
+    def _coalesce(self, peer: Peer) -> bool:
+        """
+        Merge each contiguous run of queued ICE candidates into one batch
+        frame. Runs never cross an offer/answer, so SDP/ICE order is kept.
+        True if space was freed.
+        """
+        kept: Deque[Frame] = deque()
+        run: List[Frame] = []
+
+        def flush():
+            if len(run) > 1:
+                kept.append(Frame.ice_batch([c for f in run for c in f.candidates]))
+            else:
+                kept.extend(run)
+            run.clear()
+
+        for queued in peer.queue:
+            if queued.is_candidate:
+                run.append(queued)
+            else:
+                flush()
+                kept.append(queued)
+        flush()
+        freed = len(peer.queue) - len(kept)
+        if freed <= 0:
+            return False
+        peer.queue = kept
+        self._count(peer.room_id, "coalesced", freed)
+        return True
+
+    def _evict(self, peer: Peer):
+        self._count(peer.room_id, "evicted")
+        self.disconnect(peer.room_id, peer.websocket)
+        self._spawn(self._close_quietly(peer.websocket))
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def _send(self, websocket: WebSocket, payload):
+        send = websocket.send_bytes if isinstance(payload, bytes) else websocket.send_text
+        if _deadline is not None:
+            async with _deadline(self.send_timeout):
+                await send(payload)
+        else:
+            await asyncio.wait_for(send(payload), timeout=self.send_timeout)
+
+    async def _gather_candidates(self, peer: Peer, first: Frame) -> Frame:
+        """
+        Hold an ICE candidate for up to ice_window seconds and merge every
+        candidate that arrives meanwhile into one frame. Anything else waiting
+        (offer/answer) ends the window at once so it is never delayed.
+        """
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ice_window
+        while True:
+            while peer.queue and peer.queue[0].is_candidate:
+                batch.append(peer.queue.popleft())
+            if peer.queue or peer.closed:
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            peer.ready.clear()
+            try:
+                await asyncio.wait_for(peer.ready.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        if len(batch) == 1:
+            return first
+        metrics.inc("ws.ice_coalesced", len(batch) - 1)
+        return Frame.ice_batch([c for f in batch for c in f.candidates])
+
+    async def _writer(self, peer: Peer):
+        websocket = peer.websocket
+        while True:
+            await peer.ready.wait()
+            peer.ready.clear()
+            # Drain everything queued before sleeping again
+            while peer.queue and not peer.closed:
+                frame = peer.queue.popleft()
+                if self.ice_window > 0 and peer.ice_batches and frame.is_candidate:
+                    frame = await self._gather_candidates(peer, frame)
+                try:
+                    payload = frame.payload_for(peer.codec)
+                except ValueError as e:
+                    metrics.inc("ws.untranscodable")
+                    logger.debug(f"Skipping frame: {e}")
+                    continue
+                try:
+                    await self._send(websocket, payload)
+                    continue
+                except asyncio.TimeoutError:
+                    log_sampled(
+                        logging.WARNING, "send_deadline",
+                        f"Peer exceeded {self.send_timeout}s send deadline — evicting",
+                    )
+                except WebSocketDisconnect:
+                    pass
+                except Exception as e:
+                    log_sampled(logging.ERROR, "broadcast", f"Broadcast error: {e}")
+                if not peer.closed:
+                    self._evict(peer)
+                return
+            if peer.closed:
+                return
+
+
+# Singleton instances
+manager = ConnectionManager(                                            # signaling rooms
+    backplane=create_backplane("signaling"),
+    ice_window_ms=settings.ICE_COALESCE_WINDOW_MS,
+)
+chat_manager = ConnectionManager(backplane=create_backplane("chat"))     # one room per user — see user_room()
+notification_manager = ConnectionManager(                               # one room per user as well
+    backplane=create_backplane("notifications"),
+)
 
 
-# Singleton instance
-manager = ConnectionManager()
\ No newline at end of file
+def user_room(user_id: int) -> str:
+    return f"user:{user_id}"